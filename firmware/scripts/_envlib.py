@@ -0,0 +1,86 @@
+"""
+Helpers shared by the PlatformIO .env build scripts.
+
+Imported by scripts/load_env.py and scripts/ota_bin.py so validators, the
+escape table and the parsed .env are built once per PlatformIO process. The
+native source scripts only use log().
+"""
+import os
+import re
+from pathlib import Path
+
+VERBOSE = os.environ.get("LMWB_VERBOSE", "0") == "1"
+
+# Environment variable keys: alphanumeric + underscore, not starting with a digit
+KEY_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*\Z").match
+
+# Strips one optional quote from each end of a .env value; always matches
+QUOTE_RE = re.compile(r"""^['"]?(.*?)['"]?\Z""", re.DOTALL).match
+
+# Single-pass escape table for C string literals
+C_ESCAPE = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r"})
+
+
+def log(message: str) -> None:
+    """Print informational output when LMWB_VERBOSE=1."""
+    if VERBOSE:
+        print(message)
+
+
+def sanitize_for_c_string(value: str) -> str:
+    """
+    Sanitize value for use in C string literal.
+    Escapes backslashes, quotes, and newlines to prevent injection.
+    """
+    return value.translate(C_ESCAPE)
+
+
+# Parsed .env files keyed by path, shared by every script in the process
+_DOTENV_CACHE: dict[str, dict[str, str]] = {}
+
+
+def read_dotenv(env_path) -> dict[str, str]:
+    """Parse a .env file once per process.
+
+    Returns the KEY=VALUE pairs whose keys are not already set in the
+    environment (CI takes precedence), with surrounding quotes removed.
+    A missing file yields an empty dict. The result is cached and shared;
+    do not mutate it.
+    """
+    cache_key = str(env_path)
+    cached = _DOTENV_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
+    parsed: dict[str, str] = {}
+    _DOTENV_CACHE[cache_key] = parsed
+    try:
+        raw = Path(env_path).read_bytes()
+    except FileNotFoundError:
+        return parsed
+
+    # Only lines that survive the blank/comment filter are decoded
+    for line_num, raw_line in enumerate(raw.split(b"\n"), 1):
+        raw_line = raw_line.strip()
+        if not raw_line or raw_line.startswith(b"#"):
+            continue
+        line = raw_line.decode("utf-8")
+
+        key, eq, value = line.partition("=")
+        if not eq:
+            continue
+        key = key.strip()
+
+        # Environment always wins; skip before doing any further work
+        if key in os.environ:
+            log(f"[ENV] Skipping {key} (already set in environment)")
+            continue
+
+        if not KEY_RE(key):
+            print(f"[ENV] WARNING: Skipping invalid key on line {line_num}: {key}")
+            continue
+
+        parsed[key] = QUOTE_RE(value.strip()).group(1)
+        log(f"[ENV] Set {key}={'*' * min(8, len(value))}...")
+
+    return parsed
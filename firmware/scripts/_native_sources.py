@@ -0,0 +1,24 @@
+"""
+Source files shared by the native PlatformIO environments.
+
+Imported by scripts/add_test_sources.py (native_test) and
+simulation/add_sim_sources.py (native) so both build the same config and
+utility sources in the same order.
+"""
+
+# Config manager domain files (split from monolithic config_manager.cpp)
+CONFIG_SOURCES: tuple[str, ...] = (
+    "+<config/config_manager.cpp>",
+    "+<config/config_wifi.cpp>",
+    "+<config/config_display.cpp>",
+    "+<config/config_webex.cpp>",
+    "+<config/config_mqtt.cpp>",
+    "+<config/config_supabase.cpp>",
+    "+<config/config_time.cpp>",
+    "+<config/config_export.cpp>",
+)
+
+# Common utilities
+UTILITY_SOURCES: tuple[str, ...] = ("+<common/nvs_utils.cpp>",)
+
+BASE_SOURCES: tuple[str, ...] = CONFIG_SOURCES + UTILITY_SOURCES
@@ -0,0 +1,448 @@
+"""
+Upload helpers shared by the PlatformIO upload scripts.
+
+Imported by scripts/ota_bin.py and scripts/upload_all.py so both targets
+flash with the same parameters and the caches here are process-wide.
+
+When firmware.bin matches what was last flashed to an explicit upload_port,
+the board is asked (esptool verify_flash) whether it still has that image,
+and the write is skipped if it does; set LMWB_FORCE_UPLOAD=1 to always
+flash. With LMWB_VERIFY_DEVICE=1 the board is asked before every write,
+which also catches images flashed from another checkout.
+
+Note: Only ESP32-S3 8MB is supported. 4MB ESP32 support has been dropped,
+and web assets are embedded in firmware, so only firmware.bin is flashed.
+"""
+import functools
+import hashlib
+import mmap
+import os
+import re
+import sys
+from types import MappingProxyType
+
+
+# Flash layout per chip. ESP32-S3 8MB only (4MB ESP32 support dropped);
+# factory=0x10000 (bootstrap), ota_0=0x260000 (main firmware)
+_CHIP_PROFILES = {
+    "esp32s3": {
+        "chip": "esp32s3",
+        "flash_freq": "80m",
+        "flash_size": "8MB",
+        # USB-CDC / USB-Serial-JTAG is not bound by UART timing. Only the
+        # custom upload targets use this; stock upload keeps the ini value.
+        "upload_speed": "1500000",
+        "factory_addr": "0x10000",
+        "ota_addr": "0x260000",
+    },
+}
+
+
+@functools.lru_cache(maxsize=None)
+def detect_chip(pioenv: str):
+    """Chip profile key for a PlatformIO environment, or None if unsupported."""
+    return "esp32s3" if "esp32s3" in pioenv else None
+
+
+def _chip_profile(pioenv: str) -> dict:
+    """Look up the flash profile for a PlatformIO environment."""
+    chip = detect_chip(pioenv)
+    if chip is None:
+        raise ValueError(f"{pioenv}: only ESP32-S3 8MB environments are supported")
+    return _CHIP_PROFILES[chip]
+
+
+@functools.lru_cache(maxsize=None)
+def get_ota_app_address(pioenv: str) -> str:
+    """Get the OTA partition address for uploads (protects bootstrap)."""
+    return _chip_profile(pioenv)["ota_addr"]
+
+
+# Read-only flash parameters for every (chip, use_factory) pair, built once
+_FLASH_PARAMS = {
+    (chip, use_factory): MappingProxyType({
+        "chip": profile["chip"],
+        "flash_freq": profile["flash_freq"],
+        "flash_size": profile["flash_size"],
+        "upload_speed": profile["upload_speed"],
+        "app_addr": profile["factory_addr"] if use_factory else profile["ota_addr"],
+    })
+    for chip, profile in _CHIP_PROFILES.items()
+    for use_factory in (False, True)
+}
+
+
+def ota_params(pioenv: str, use_factory: bool = False) -> MappingProxyType:
+    """Get flash parameters for ESP32-S3 8MB environment.
+
+    Args:
+        pioenv: PlatformIO environment name
+        use_factory: If True, target factory partition (bootstrap).
+                     If False, target ota_0 partition (main firmware).
+
+    Returns a shared read-only mapping.
+    """
+    chip = detect_chip(pioenv)
+    if chip is None:
+        raise ValueError(f"{pioenv}: only ESP32-S3 8MB environments are supported")
+    return _FLASH_PARAMS[chip, bool(use_factory)]
+
+
+@functools.lru_cache(maxsize=None)
+def resolve_tools(core_dir: str) -> tuple:
+    """Locate esptool and the penv interpreter for a PlatformIO core directory.
+
+    Returns (esptool_dir, python_exe); python_exe is only used when esptool
+    runs in a child process.
+    """
+    tool_dir = os.path.join(core_dir, "packages", "tool-esptoolpy")
+    penv_python = os.path.join(core_dir, "penv", "bin", "python")
+    python_exe = penv_python if os.path.exists(penv_python) else sys.executable
+    return tool_dir, python_exe
+
+
+@functools.lru_cache(maxsize=None)
+def esptool_command(tool_dir: str, python_exe: str) -> tuple:
+    """Command prefix for running esptool in a child process.
+
+    Prefers esptool.py from the PlatformIO package, then an esptool on PATH
+    (e.g. pip-installed). Returns () if neither exists.
+    """
+    script = os.path.join(tool_dir, "esptool.py")
+    if os.path.isfile(script):
+        return (python_exe, script)
+    import shutil
+
+    for name in ("esptool.py", "esptool"):
+        found = shutil.which(name)
+        if found:
+            return (found,)
+    return ()
+
+
+def run_esptool(tool_dir: str, argv: list, python_exe: str = sys.executable) -> int:
+    """Run esptool in this interpreter instead of spawning a new one.
+
+    Falls back to running esptool as a subprocess (see esptool_command) if
+    the package cannot be imported. Arguments are passed as a list either
+    way, so no shell is involved. Returns a shell-style exit code for SCons.
+    """
+    if tool_dir not in sys.path:
+        sys.path.insert(0, tool_dir)
+    try:
+        import esptool
+    except ImportError:
+        command = esptool_command(tool_dir, python_exe)
+        if not command:
+            print(f"[UPLOAD] ERROR: esptool not found in {tool_dir} or on PATH")
+            print("[UPLOAD] Install it with: pio pkg install -t platformio/tool-esptoolpy")
+            return 1
+        import subprocess
+
+        return subprocess.run([*command, *argv], check=False).returncode
+
+    try:
+        esptool.main(argv)
+    except SystemExit as exc:
+        # esptool exits via sys.exit() on failure
+        if exc.code is None:
+            return 0
+        return exc.code if isinstance(exc.code, int) else 1
+    except Exception as exc:
+        print(f"[UPLOAD] ERROR: esptool failed: {exc}")
+        return 1
+    return 0
+
+
+def firmware_digest(path: str) -> str:
+    """Hash a firmware image without reading it into a bytes object.
+
+    blake2b is used rather than sha256 since the digest only has to match
+    our own marker files, and it is faster where SHA extensions are missing.
+    """
+    with open(path, "rb") as handle:
+        # mmap refuses zero-length files (e.g. an interrupted link)
+        if os.fstat(handle.fileno()).st_size == 0:
+            return hashlib.blake2b(b"", digest_size=16).hexdigest()
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _upload_marker(build_dir: str, port: str, use_factory: bool) -> str:
+    """Path of the file recording the last image flashed to port/partition."""
+    slot = "factory" if use_factory else "ota_0"
+    port_key = re.sub(r"[^A-Za-z0-9]+", "_", port).strip("_")
+    return os.path.join(build_dir, f".last_upload_{port_key}_{slot}")
+
+
+def _read_marker(path: str) -> str:
+    try:
+        with open(path, encoding="utf-8") as handle:
+            return handle.read().strip()
+    except OSError:
+        return ""
+
+
+def _write_marker(path: str, digest: str) -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        handle.write(digest)
+    os.replace(tmp_path, path)
+
+
+def _format_age(seconds: float) -> str:
+    minutes = max(0, int(seconds // 60))
+    if minutes < 120:
+        return f"{minutes} min"
+    hours = minutes // 60
+    if hours < 48:
+        return f"{hours} h"
+    return f"{hours // 24} days"
+
+
+def _write_flash_argv(params, port: str, speed: str, firmware_bin: str) -> list:
+    """Build the esptool argv that writes firmware_bin to params["app_addr"]."""
+    argv = ["--chip", params["chip"]]
+    if port:
+        argv += ["--port", port]
+    # esptool only patches flash header fields at the bootloader offset, so
+    # skip the flash size probe for app partitions; --compress is explicit so
+    # the deflated stub transfer is used whatever the esptool default
+    argv += [
+        "--baud", speed,
+        "write_flash", "--flash_size", "keep", "--compress",
+        params["app_addr"], firmware_bin,
+    ]
+    return argv
+
+
+def _verify_flash_argv(params, port: str, speed: str, firmware_bin: str) -> list:
+    """Build the esptool argv that checks firmware_bin against the device."""
+    argv = _write_flash_argv(params, port, speed, firmware_bin)
+    write_at = argv.index("write_flash")
+    argv[write_at:] = ["verify_flash", params["app_addr"], firmware_bin]
+    return argv
+
+
+def _announce_upload(params, use_factory: bool) -> None:
+    partition_name = "FACTORY (bootstrap)" if use_factory else "OTA_0 (main firmware)"
+    print(
+        f"[UPLOAD] Uploading firmware to {partition_name} partition at {params['app_addr']}"
+    )
+    print(
+        "[UPLOAD] Web assets are embedded in firmware - no separate LittleFS upload needed"
+    )
+
+    if use_factory:
+        print("[UPLOAD] WARNING: This will overwrite the bootstrap firmware!")
+
+
+def _check_marker(build_dir: str, port: str, use_factory: bool, digest: str) -> tuple:
+    """Return (marker, unchanged) for an upload to port.
+
+    marker is the path to update after flashing, or "" to flash without
+    recording one: without an explicit port esptool may pick any attached
+    device. unchanged means firmware.bin matches the last image flashed to
+    port; the board may have been reflashed since, so callers confirm it
+    with verify_flash before skipping.
+    """
+    if not port or os.environ.get("LMWB_FORCE_UPLOAD", "0") == "1":
+        return "", False
+    marker = _upload_marker(build_dir, port, use_factory)
+    if _read_marker(marker) != digest:
+        return marker, False
+    import time
+
+    age = _format_age(time.time() - os.path.getmtime(marker))
+    print(f"[UPLOAD] {port}: same image as the last flash {age} ago - checking the device")
+    return marker, True
+
+
+_UPLOAD_VARS = ("$PROJECT_BUILD_DIR", "$UPLOAD_PORT", "$UPLOAD_SPEED", "$PLATFORMIO_CORE_DIR")
+
+
+def _expand_upload_vars(env) -> tuple:
+    """Return (build_dir, port, speed, core_dir) from one SCons expansion.
+
+    Falls back to expanding each variable separately if a value itself
+    contains the separator.
+    """
+    values = env.subst("|".join(_UPLOAD_VARS)).split("|")
+    if len(values) != len(_UPLOAD_VARS):
+        values = [env.subst(var) for var in _UPLOAD_VARS]
+    project_build_dir, port, speed, core_dir = (value.strip() for value in values)
+    build_dir = os.path.join(project_build_dir, env["PIOENV"])
+    return build_dir, port, speed, core_dir or os.path.expanduser("~/.platformio")
+
+
+def _upload_speed(env, speed: str, params) -> str:
+    """Baud rate for the custom upload targets.
+
+    upload_speed in [esp32s3_common] is the conservative value used by stock
+    upload/uploadfs, so it is replaced by the chip profile's speed. An
+    environment that sets a different upload_speed, or the UPLOAD_SPEED
+    environment variable, overrides the profile.
+    """
+    override = os.environ.get("UPLOAD_SPEED", "").strip()
+    if override:
+        return override
+    shared = str(env.GetProjectConfig().get("esp32s3_common", "upload_speed", "")).strip()
+    if speed and speed != shared:
+        return speed
+    return params["upload_speed"]
+
+
+def upload_to_partition(env, use_factory: bool = False) -> int:
+    """Upload firmware.bin to the ota_0 or factory partition.
+
+    Args:
+        env: SCons construction environment of the calling target.
+        use_factory: If True, upload to factory partition (DANGEROUS - overwrites bootstrap).
+                     If False, upload to ota_0 partition (safe).
+    """
+    pioenv = env["PIOENV"]
+    build_dir, port, speed, core_dir = _expand_upload_vars(env)
+    firmware_bin = os.path.join(build_dir, "firmware.bin")
+
+    if detect_chip(pioenv) is None:
+        print(f"[UPLOAD] ERROR: {pioenv} is not supported (ESP32-S3 8MB only)")
+        return 1
+
+    # Validate firmware binary exists
+    if not os.path.exists(firmware_bin):
+        print(f"[UPLOAD] ERROR: Firmware binary not found: {firmware_bin}")
+        return 1
+
+    params = ota_params(pioenv, use_factory=use_factory)
+    speed = _upload_speed(env, speed, params)
+    _announce_upload(params, use_factory)
+
+    tool_dir, python_exe = resolve_tools(core_dir)
+    digest = firmware_digest(firmware_bin) if port else ""
+    marker, unchanged = _check_marker(build_dir, port, use_factory, digest)
+
+    verify = unchanged or os.environ.get("LMWB_VERIFY_DEVICE", "0") == "1"
+    if verify and os.environ.get("LMWB_FORCE_UPLOAD", "0") != "1":
+        # verify_flash compares an on-device MD5 via the stub, a second or
+        # two against a full write; a mismatch just falls through to write
+        if not unchanged:
+            print("[UPLOAD] Checking firmware already on the device...")
+        verify_argv = _verify_flash_argv(params, port, speed, firmware_bin)
+        if run_esptool(tool_dir, verify_argv, python_exe) == 0:
+            print("[UPLOAD] firmware already on the device - skipping")
+            print("[UPLOAD] Set LMWB_FORCE_UPLOAD=1 to flash anyway")
+            if marker:
+                _write_marker(marker, digest)
+            return 0
+
+    argv = _write_flash_argv(params, port, speed, firmware_bin)
+    result = run_esptool(tool_dir, argv, python_exe)
+    if result == 0 and marker:
+        _write_marker(marker, digest)
+    return result
+
+
+# Serial devices probed when no port list is configured
+_PORT_PATTERNS = ("/dev/ttyUSB*", "/dev/ttyACM*", "/dev/cu.usbmodem*", "/dev/cu.usbserial*")
+
+
+def detect_upload_ports(env) -> list:
+    """Ports for a batch upload.
+
+    Taken from LMWB_UPLOAD_PORTS or the custom_upload_ports project option
+    (comma separated), otherwise every USB serial device that is attached.
+    """
+    configured = os.environ.get("LMWB_UPLOAD_PORTS") or env.GetProjectOption(
+        "custom_upload_ports", ""
+    )
+    if configured:
+        return [port.strip() for port in configured.split(",") if port.strip()]
+
+    import glob
+
+    return sorted({port for pattern in _PORT_PATTERNS for port in glob.glob(pattern)})
+
+
+def upload_to_ports(env, ports: list, use_factory: bool = False) -> int:
+    """Flash firmware.bin to several boards at once, one esptool per port.
+
+    esptool keeps global state, so each port gets its own interpreter; the
+    threads only wait on those processes. Output is captured per port and
+    printed as each one finishes. Returns 1 if any port failed.
+    """
+    pioenv = env["PIOENV"]
+    build_dir, _, speed, core_dir = _expand_upload_vars(env)
+    firmware_bin = os.path.join(build_dir, "firmware.bin")
+
+    if detect_chip(pioenv) is None:
+        print(f"[UPLOAD] ERROR: {pioenv} is not supported (ESP32-S3 8MB only)")
+        return 1
+    if not ports:
+        print("[UPLOAD] ERROR: No upload ports found; set LMWB_UPLOAD_PORTS")
+        return 1
+    if not os.path.exists(firmware_bin):
+        print(f"[UPLOAD] ERROR: Firmware binary not found: {firmware_bin}")
+        return 1
+
+    params = ota_params(pioenv, use_factory=use_factory)
+    speed = _upload_speed(env, speed, params)
+    _announce_upload(params, use_factory)
+    print(f"[UPLOAD] Flashing {len(ports)} device(s): {', '.join(ports)}")
+
+    import subprocess
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    command = esptool_command(*resolve_tools(core_dir))
+    if not command:
+        print("[UPLOAD] ERROR: esptool not found in the PlatformIO packages or on PATH")
+        return 1
+
+    digest = firmware_digest(firmware_bin)
+    # port -> (marker, unchanged)
+    pending = {port: _check_marker(build_dir, port, use_factory, digest) for port in ports}
+
+    def esptool(argv: list):
+        return subprocess.run(
+            [*command, *argv],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            check=False,
+        )
+
+    def flash(port: str):
+        # Returns (skipped, proc); an unchanged image is only skipped once
+        # the board confirms it still has it
+        if pending[port][1]:
+            proc = esptool(_verify_flash_argv(params, port, speed, firmware_bin))
+            if proc.returncode == 0:
+                return True, proc
+        return False, esptool(_write_flash_argv(params, port, speed, firmware_bin))
+
+    failed = []
+    workers = min(len(pending), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(flash, port): port for port in pending}
+        for future in as_completed(futures):
+            port = futures[future]
+            try:
+                skipped, proc = future.result()
+            except OSError as exc:
+                print(f"[UPLOAD] {port}: ERROR: {exc}")
+                failed.append(port)
+                continue
+            if skipped:
+                print(f"[UPLOAD] {port}: firmware already on the device - skipped")
+            elif proc.returncode == 0:
+                print(f"[UPLOAD] {port}: OK")
+                if pending[port][0]:
+                    _write_marker(pending[port][0], digest)
+            else:
+                print(f"[UPLOAD] {port}: FAILED (exit {proc.returncode})")
+                print(proc.stdout.rstrip())
+                failed.append(port)
+
+    if failed:
+        print(f"[UPLOAD] ERROR: {len(failed)} of {len(pending)} device(s) failed")
+        return 1
+    return 0
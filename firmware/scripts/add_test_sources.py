@@ -2,13 +2,15 @@
 PlatformIO pre-script to add test source files.
 
 This script is executed by PlatformIO's SCons build system which injects
-the 'Import' function and 'env' object at runtime.
+the 'Import' function and 'env' object at runtime. Set LMWB_VERBOSE=1 to
+print what was added.
 """
 # pylint: disable=undefined-variable,used-before-assignment
 # pyright: reportUndefinedVariable=false, reportUnboundVariable=false
 # mypy: disable-error-code="name-defined"
-from typing import TYPE_CHECKING, Any
 import os
+import sys
+from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
     from SCons.Script import Environment  # type: ignore[import-not-found]
@@ -29,19 +31,16 @@ if not test_name:
     if "test_serial_commands" in cwd:
         test_name = "test_serial_commands"
 
+# Shared source lists live next to this script
+_scripts_dir = os.path.join(env.subst("$PROJECT_DIR"), "scripts")  # noqa: F821
+if _scripts_dir not in sys.path:
+    sys.path.insert(0, _scripts_dir)
+
+from _envlib import log  # noqa: E402
+from _native_sources import BASE_SOURCES  # noqa: E402
+
 # Add config manager (split into domain files), nvs utils, and mock globals to the build
-src_filter = [
-    # Config manager domain files (split from monolithic config_manager.cpp)
-    "+<config/config_manager.cpp>",
-    "+<config/config_wifi.cpp>",
-    "+<config/config_display.cpp>",
-    "+<config/config_webex.cpp>",
-    "+<config/config_mqtt.cpp>",
-    "+<config/config_supabase.cpp>",
-    "+<config/config_time.cpp>",
-    "+<config/config_export.cpp>",
-    # Common utilities
-    "+<common/nvs_utils.cpp>",
+src_filter = list(BASE_SOURCES) + [
     # Note: serial_commands.cpp is excluded from native test builds because it
     # depends on ESP32-specific APIs (heap_caps, esp_partition, FreeRTOS tasks).
     # The mocks in globals.cpp use weak linkage to provide the necessary symbols.
@@ -64,4 +63,4 @@ env.Append(SRC_FILTER=src_filter)  # noqa: F821
 # This allows tests that include serial_commands.cpp to use the real implementation,
 # while tests that don't include it will use the weak mocks.
 
-print("[TEST] Added config domain files, utilities and mocks to test build")
+log("[TEST] Added config domain files, utilities and mocks to test build")
@@ -0,0 +1,33 @@
+# mypy: ignore-errors
+"""
+Route compiler invocations through ccache when it is installed.
+
+This must run as a post script: PlatformIO's platform builder sets CC/CXX
+after pre: scripts have run, so wrapping them any earlier would be undone.
+Set LMWB_NO_CCACHE=1 to disable.
+"""
+import os
+import shutil
+
+Import("env")
+
+
+def enable_ccache():
+    """Prefix CC and CXX with ccache if it is available on PATH."""
+    if os.environ.get("LMWB_NO_CCACHE", "0") == "1":
+        return
+
+    ccache = shutil.which("ccache")
+    if not ccache:
+        return
+
+    for var in ("CC", "CXX"):
+        current = env.get(var, "")
+        if current and not current.startswith("ccache "):
+            env.Replace(**{var: f"ccache {current}"})
+
+    # Timestamp macros and precompiled-header defines would otherwise bust the cache
+    env["ENV"]["CCACHE_SLOPPINESS"] = "pch_defines,time_macros"
+
+
+enable_ccache()
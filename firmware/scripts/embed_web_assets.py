@@ -11,6 +11,7 @@ The generated header allows serving web assets directly from firmware
 flash memory, eliminating the need for LittleFS for static files.
 """
 import gzip
+import hashlib
 import os
 from pathlib import Path
 
@@ -106,14 +107,38 @@ def find_web_files(data_dir: str) -> list:
     return sorted(files)
 
 
-def generate_embedded_assets_header(data_dir: str, output_path: str) -> None:
-    """Generate the embedded_assets.h header file."""
+def assets_digest(files: list) -> str:
+    """Digest the path, size and mtime of each file to embed."""
+    # Bump the key when the generated header layout changes
+    digest = hashlib.blake2b(digest_size=16, key=b"embedded_assets.h v1")
+    for filepath in files:
+        st = os.stat(filepath)
+        digest.update(f"{filepath}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def generate_embedded_assets_header(data_dir: str, output_path: str, digest_path: str = "") -> None:
+    """Generate the embedded_assets.h header file.
+
+    If digest_path is given and data/ is unchanged since the header was last
+    generated, the header is left alone so nothing that includes it rebuilds.
+    """
     files = find_web_files(data_dir)
     
     if not files:
         print(f"[EMBED] No web files found in {data_dir}")
         return
     
+    digest = assets_digest(files)
+    if digest_path and os.path.exists(output_path):
+        try:
+            with open(digest_path, encoding="utf-8") as f:
+                if f.read().strip() == digest:
+                    print(f"[EMBED] {len(files)} web files unchanged - keeping {output_path}")
+                    return
+        except OSError:
+            pass
+    
     print(f"[EMBED] Processing {len(files)} web files from {data_dir}")
     
     lines = []
@@ -145,7 +170,8 @@ def generate_embedded_assets_header(data_dir: str, output_path: str) -> None:
         with open(filepath, "rb") as f:
             original_data = f.read()
         
-        compressed_data = gzip.compress(original_data, compresslevel=9)
+        # mtime=0 keeps the output identical for identical input
+        compressed_data = gzip.compress(original_data, compresslevel=9, mtime=0)
         
         original_size = len(original_data)
         compressed_size = len(compressed_data)
@@ -186,16 +212,31 @@ def generate_embedded_assets_header(data_dir: str, output_path: str) -> None:
     lines.append("")
     lines.append("#endif // EMBEDDED_ASSETS_H")
     
-    # Write the header file
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(lines))
+    # Write the header file only if it changed, via rename so an interrupted
+    # build never leaves a truncated header behind
+    new_bytes = "\n".join(lines).encode("utf-8")
+    try:
+        with open(output_path, "rb") as f:
+            old_bytes = f.read()
+    except FileNotFoundError:
+        old_bytes = None
+    if old_bytes != new_bytes:
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        tmp_path = output_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(new_bytes)
+        os.replace(tmp_path, output_path)
+    
+    if digest_path:
+        os.makedirs(os.path.dirname(digest_path), exist_ok=True)
+        with open(digest_path, "w", encoding="utf-8") as f:
+            f.write(digest)
     
     total_original = sum(a["original_size"] for a in assets)
     total_compressed = sum(a["compressed_size"] for a in assets)
     total_ratio = (1 - total_compressed / total_original) * 100 if total_original > 0 else 0
     
-    print(f"[EMBED] Generated {output_path}")
+    print(f"[EMBED] {'Generated' if old_bytes != new_bytes else 'Unchanged'} {output_path}")
     print(f"[EMBED] Total: {total_original} -> {total_compressed} bytes ({total_ratio:.1f}% reduction)")
 
 
@@ -210,7 +251,8 @@ def run_embed_assets(env):
     else:
         output_path = os.path.join(project_dir, "src", "web", "embedded_assets.h")
     
-    generate_embedded_assets_header(data_dir, output_path)
+    digest_path = os.path.join(project_dir, ".pio", ".embed_digest_" + env.subst("$PIOENV"))
+    generate_embedded_assets_header(data_dir, output_path, digest_path)
 
 
 # Run immediately when script loads (during PlatformIO's pre-build phase)
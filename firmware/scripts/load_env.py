@@ -2,47 +2,75 @@
 Load environment variables from .env file and add Supabase build flags.
 
 This script runs as a pre-build step to:
-1. Load variables from firmware/.env into the environment
-2. Add Supabase URL and anon key as build flags for the firmware
+1. Enable a shared object cache under .pio/build_cache
+2. Load variables from firmware/.env into the environment
+3. Add Supabase URL and anon key as build flags for the firmware
+4. Optionally enable link-time optimization (LMWB_LTO=1) for release builds
+
+Informational output is only printed with LMWB_VERBOSE=1; warnings and
+errors are always shown.
 """
 
 import os
 import re
+import sys
 from pathlib import Path
 
 Import("env")  # type: ignore  # noqa: F821  # PlatformIO built-in
 
+# Shared helpers live next to this script
+_scripts_dir = os.path.join(env.subst("$PROJECT_DIR"), "scripts")  # noqa: F821
+if _scripts_dir not in sys.path:
+    sys.path.insert(0, _scripts_dir)
+
+from _envlib import read_dotenv, sanitize_for_c_string  # noqa: E402
+from _envlib import log as _log  # noqa: E402
+
+# Validators are compiled once at import instead of per .env line
+# Allow https URLs with alphanumeric, dots, hyphens, and common URL chars
+_URL_RE = re.compile(r"^https://[a-zA-Z0-9\-._~:/?#\[\]@!$&\'()*+,;=]+\Z").match
+# JWT format: header.payload.signature (base64url + dots)
+_JWT_RE = re.compile(r"^[A-Za-z0-9_\-]+\.[A-Za-z0-9_\-]+\.[A-Za-z0-9_\-]+\Z").match
 
-def is_safe_env_key(key: str) -> bool:
-    """Validate environment variable key is safe (alphanumeric + underscore)."""
-    return bool(re.match(r"^[A-Za-z_][A-Za-z0-9_]*$", key))
+# Environment keys consumed by add_supabase_build_flags
+SUPABASE_ENV_KEYS = ("SUPABASE_URL", "SUPABASE_ANON_KEY")
 
 
 def is_safe_url(value: str) -> bool:
     """Validate URL format (basic validation for Supabase URLs)."""
-    # Allow https URLs with alphanumeric, dots, hyphens, and common URL chars
-    return bool(re.match(r"^https://[a-zA-Z0-9\-._~:/?#\[\]@!$&\'()*+,;=]+$", value))
+    return _URL_RE(value) is not None
 
 
 def is_safe_anon_key(value: str) -> bool:
     """Validate anon key format (JWT tokens are base64url encoded)."""
-    # JWT format: header.payload.signature (base64url + dots)
-    return bool(re.match(r"^[A-Za-z0-9_\-]+\.[A-Za-z0-9_\-]+\.[A-Za-z0-9_\-]+$", value))
+    return _JWT_RE(value) is not None
 
 
-def sanitize_for_c_string(value: str) -> str:
-    """
-    Sanitize value for use in C string literal.
-    Escapes backslashes and quotes to prevent injection.
+def enable_build_cache():
+    """Share compiled objects across environments and repeat builds.
+
+    Respects a build_cache_dir already configured in platformio.ini.
     """
-    # Escape backslashes first, then quotes
-    value = value.replace("\\", "\\\\")
-    value = value.replace('"', '\\"')
-    return value
+    cache_dir = env.subst("$BUILD_CACHE_DIR")  # noqa: F821
+    if not cache_dir:
+        cache_dir = str(Path(env.subst("$PROJECT_DIR")) / ".pio" / "build_cache")  # noqa: F821
+        env.Replace(BUILD_CACHE_DIR=cache_dir)  # noqa: F821
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    env.CacheDir(cache_dir)  # noqa: F821
+
 
+def load_dotenv() -> dict[str, str]:
+    """Load .env file from firmware directory.
+
+    Returns the values not already present in the environment. Keys other
+    than the Supabase ones are exported to os.environ in a single update for
+    the scripts that run after this one.
+    """
+    # CI provides everything via the environment, which always wins anyway
+    if all(key in os.environ for key in SUPABASE_ENV_KEYS):
+        _log("[load_env] Supabase config already set in environment, skipping .env")
+        return {}
 
-def load_dotenv():
-    """Load .env file from firmware directory."""
     # PlatformIO runs extra_scripts in a SCons context where __file__ may not exist.
     # Prefer PlatformIO's PROJECT_DIR when available.
     project_dir = env.get("PROJECT_DIR")  # noqa: F821
@@ -54,45 +82,26 @@ def load_dotenv():
     env_file = firmware_dir / ".env"
 
     if not env_file.exists():
-        print(f"[load_env] No .env file found at {env_file}")
-        return
+        _log(f"[load_env] No .env file found at {env_file}")
+        return {}
+
+    _log(f"[load_env] Loading environment from {env_file}")
+    parsed = read_dotenv(env_file)
+
+    # Supabase values are consumed directly from the returned dict
+    os.environ.update({k: v for k, v in parsed.items() if k not in SUPABASE_ENV_KEYS})
+    return parsed
 
-    print(f"[load_env] Loading environment from {env_file}")
-
-    with open(env_file, encoding="utf-8") as f:
-        for line_num, line in enumerate(f, 1):
-            line = line.strip()
-            # Skip empty lines and comments
-            if not line or line.startswith("#"):
-                continue
-
-            # Parse KEY=VALUE
-            if "=" in line:
-                key, value = line.split("=", 1)
-                key = key.strip()
-                value = value.strip()
-
-                # Validate key format
-                if not is_safe_env_key(key):
-                    print(
-                        f"[load_env] WARNING: Skipping invalid key on line {line_num}: {key}"
-                    )
-                    continue
-
-                # Only set if not already in environment (CI takes precedence)
-                if key not in os.environ:
-                    os.environ[key] = value
-                    print(f"[load_env] Set {key}={'*' * min(8, len(value))}...")
-                else:
-                    print(f"[load_env] Skipping {key} (already set in environment)")
-
-
-def add_supabase_build_flags():
-    """Add Supabase configuration as build flags."""
+
+def add_supabase_build_flags(parsed: dict[str, str]):
+    """Add Supabase configuration as build flags.
+
+    Values come from the parsed .env first, then the process environment.
+    """
     build_flags = []
 
     # Supabase URL
-    supabase_url = os.environ.get("SUPABASE_URL", "")
+    supabase_url = parsed.get("SUPABASE_URL") or os.environ.get("SUPABASE_URL", "")
     if supabase_url:
         # Validate URL format before using
         if not is_safe_url(supabase_url):
@@ -102,19 +111,21 @@ def add_supabase_build_flags():
         # Sanitize for C string literal
         safe_url = sanitize_for_c_string(supabase_url)
         build_flags.append(f'-DDEFAULT_SUPABASE_URL=\\"{safe_url}\\"')
-        print("[load_env] Added build flag: DEFAULT_SUPABASE_URL")
+        _log("[load_env] Added build flag: DEFAULT_SUPABASE_URL")
 
         # Set OTA manifest URL to point directly to Supabase Edge Function
         manifest_url = f"{supabase_url}/functions/v1/get-manifest"
         safe_manifest_url = sanitize_for_c_string(manifest_url)
         build_flags.append(f'-DDEFAULT_OTA_URL=\\"{safe_manifest_url}\\"')
         build_flags.append(f'-DDEFAULT_OTA_MANIFEST_URL=\\"{safe_manifest_url}\\"')
-        print(f"[load_env] Added build flag: DEFAULT_OTA_URL={manifest_url}")
+        _log(f"[load_env] Added build flag: DEFAULT_OTA_URL={manifest_url}")
     else:
         print("[load_env] Warning: SUPABASE_URL not set")
 
     # Supabase Anon Key (for Realtime)
-    supabase_anon_key = os.environ.get("SUPABASE_ANON_KEY", "")
+    supabase_anon_key = parsed.get("SUPABASE_ANON_KEY") or os.environ.get(
+        "SUPABASE_ANON_KEY", ""
+    )
     if supabase_anon_key:
         # Validate JWT format
         if not is_safe_anon_key(supabase_anon_key):
@@ -124,7 +135,7 @@ def add_supabase_build_flags():
         # Sanitize for C string literal
         safe_key = sanitize_for_c_string(supabase_anon_key)
         build_flags.append(f'-DDEFAULT_SUPABASE_ANON_KEY=\\"{safe_key}\\"')
-        print("[load_env] Added build flag: DEFAULT_SUPABASE_ANON_KEY")
+        _log("[load_env] Added build flag: DEFAULT_SUPABASE_ANON_KEY")
     else:
         print(
             "[load_env] Warning: SUPABASE_ANON_KEY not set (Phase B realtime disabled)"
@@ -132,11 +143,30 @@ def add_supabase_build_flags():
 
     # Add flags to build environment
     if build_flags:
-        env.Append(CPPDEFINES=[])  # noqa: F821
-        for flag in build_flags:
-            env.Append(BUILD_FLAGS=[flag])  # noqa: F821
+        # Sorted so the command line (and therefore cache keys) stays stable
+        env.Append(BUILD_FLAGS=sorted(build_flags))  # noqa: F821
+
+
+def add_release_flags():
+    """Enable LTO and section GC for release firmware when LMWB_LTO=1.
+
+    Off by default so day-to-day debug builds keep fast incremental links.
+    """
+    if os.environ.get("LMWB_LTO", "0") != "1":
+        return
+
+    pioenv = env.get("PIOENV", "")  # noqa: F821
+    if "native" in pioenv or "debug" in pioenv:
+        return
+
+    env.Append(  # noqa: F821
+        BUILD_FLAGS=["-flto", "-ffunction-sections", "-fdata-sections"],
+        LINKFLAGS=["-flto", "-Wl,--gc-sections"],
+    )
+    _log(f"[load_env] Link-time optimization enabled for {pioenv}")
 
 
 # Run on script import
-load_dotenv()
-add_supabase_build_flags()
+enable_build_cache()
+add_supabase_build_flags(load_dotenv())
+add_release_flags()
@@ -3,12 +3,18 @@ PlatformIO pre-build script to inject version information.
 
 This script is executed by PlatformIO's SCons build system which injects
 the 'Import' function and 'env' object at runtime.
+
+BUILD_ID changes on every build, so it is written to
+$BUILD_DIR/include/build_info.h (only included by api_status.cpp) instead of
+the global CPPDEFINES, which would force every object file to recompile. Set SOURCE_DATE_EPOCH or
+BUILD_ID_OVERRIDE for reproducible builds; on CI GITHUB_SHA is used for the
+commit instead of asking git.
 """
 # pylint: disable=undefined-variable,used-before-assignment
 # pyright: reportUndefinedVariable=false, reportUnboundVariable=false
 # mypy: disable-error-code="name-defined"
-import subprocess
-import time
+import functools
+import os
 from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
@@ -21,32 +27,121 @@ env: "Environment"  # noqa: F821
 Import("env")  # noqa: F821
 
 
-def get_git_version() -> str:
-    """Get version from git tags or use default."""
+def _git_state_key(project_dir: str) -> str:
+    """Describe the refs that can change `git describe`, or '' if unknown.
+
+    Built from the mtimes of HEAD, the current branch ref, packed-refs and
+    refs/tags, so a commit, checkout or new tag invalidates the cache.
+    """
+    path = os.path.abspath(project_dir)
+    while not os.path.isdir(os.path.join(path, ".git")):
+        parent = os.path.dirname(path)
+        if parent == path:
+            return ""
+        path = parent
+    git_dir = os.path.join(path, ".git")
+
+    watched = [
+        os.path.join(git_dir, "HEAD"),
+        os.path.join(git_dir, "packed-refs"),
+        os.path.join(git_dir, "refs", "tags"),
+    ]
     try:
-        git_version = subprocess.check_output(
-            ["git", "describe", "--tags", "--always"],
-            stderr=subprocess.DEVNULL,
+        with open(watched[0], encoding="utf-8") as f:
+            head = f.read().strip()
+    except OSError:
+        return ""
+    if head.startswith("ref: "):
+        watched.append(os.path.join(git_dir, *head[5:].split("/")))
+
+    stamps = []
+    for item in watched:
+        try:
+            stamps.append(str(os.stat(item).st_mtime_ns))
+        except OSError:
+            stamps.append("-")
+    return head + ":" + ",".join(stamps)
+
+
+def _run_git(project_dir: str) -> tuple:
+    """Return (describe, short_commit) from a single git invocation."""
+    import subprocess
+
+    def git(*args: str) -> str:
+        return subprocess.check_output(
+            ["git", *args], cwd=project_dir, stderr=subprocess.DEVNULL
         ).decode().strip()
-        return git_version
+
+    try:
+        lines = git("log", "-1", "--format=%h%n%(describe:tags)").splitlines()
     except (subprocess.CalledProcessError, FileNotFoundError, OSError):
-        return "1.0.0-dev"
+        return None, None
+    commit = lines[0] if lines else None
+    describe = lines[1] if len(lines) > 1 else ""
+    if describe.startswith("%("):
+        # git < 2.32 does not know %(describe); ask for it separately
+        try:
+            describe = git("describe", "--tags", "--always")
+        except (subprocess.CalledProcessError, FileNotFoundError, OSError):
+            describe = ""
+    # Match `git describe --always`: untagged history reports the hash
+    return describe or commit, commit
+
+
+@functools.lru_cache(maxsize=None)
+def _git_info() -> tuple:
+    """Return (describe, short_commit), reusing .pio/.version_cache.
+
+    On warm rebuilds nothing under .git has changed, so git is not run.
+    """
+    project_dir = env.subst("$PROJECT_DIR")
+    cache_path = os.path.join(project_dir, ".pio", ".version_cache")
+    key = _git_state_key(project_dir)
+
+    info = None
+    if key:
+        try:
+            with open(cache_path, encoding="utf-8") as f:
+                cached_key, describe, commit = f.read().split("\n")[:3]
+            if cached_key == key:
+                info = (describe, commit)
+        except (OSError, ValueError):
+            pass
+
+    if info is None:
+        info = _run_git(project_dir)
+        if key and info[1]:
+            try:
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                with open(cache_path, "w", encoding="utf-8") as f:
+                    f.write(f"{key}\n{info[0]}\n{info[1]}\n")
+            except OSError:
+                pass
+
+    return info
+
+
+def get_git_version() -> str:
+    """Get version from git tags or use default."""
+    return _git_info()[0] or "1.0.0-dev"
 
 
 def get_git_commit() -> str:
     """Get current git commit hash."""
-    try:
-        git_commit = subprocess.check_output(
-            ["git", "rev-parse", "--short", "HEAD"],
-            stderr=subprocess.DEVNULL,
-        ).decode().strip()
-        return git_commit
-    except (subprocess.CalledProcessError, FileNotFoundError, OSError):
-        return "unknown"
+    ci_sha = os.environ.get("GITHUB_SHA", "").strip()
+    if ci_sha:
+        return ci_sha[:7]
+    return _git_info()[1] or "unknown"
 
 
 def get_build_id() -> str:
     """Get a build ID based on epoch seconds."""
+    override = os.environ.get("SOURCE_DATE_EPOCH") or os.environ.get("BUILD_ID_OVERRIDE")
+    if override:
+        return override.strip()
+
+    import time
+
     try:
         return str(int(time.time()))
     except (OSError, ValueError):
@@ -58,7 +153,6 @@ def get_firmware_version() -> str:
     # Try to get from platformio.ini [version] section
     try:
         import configparser
-        import os
         ini_path = os.path.join(env.subst("$PROJECT_DIR"), "platformio.ini")
         config = configparser.ConfigParser()
         config.read(ini_path)
@@ -69,6 +163,37 @@ def get_firmware_version() -> str:
     return get_git_version()
 
 
+def write_build_info_header(build_id: str) -> None:
+    """Write BUILD_ID to a header in the build directory and add it to CPPPATH.
+
+    The header is left untouched if unchanged.
+    """
+    include_dir = os.path.join(env.subst("$BUILD_DIR"), "include")
+    os.makedirs(include_dir, exist_ok=True)
+    env.Append(CPPPATH=[include_dir])  # noqa: F821
+
+    header_path = os.path.join(include_dir, "build_info.h")
+    build_id = build_id.replace("\\", "\\\\").replace('"', '\\"')
+    content = (
+        "// Auto-generated by scripts/version.py - DO NOT EDIT\n"
+        "#pragma once\n"
+        "\n"
+        f'#define BUILD_ID "{build_id}"\n'
+    )
+    new_bytes = content.encode("utf-8")
+    try:
+        with open(header_path, "rb") as f:
+            if f.read() == new_bytes:
+                return
+    except OSError:
+        pass
+    # Write then rename so an interrupted build never leaves half a header
+    tmp_path = header_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(new_bytes)
+    os.replace(tmp_path, header_path)
+
+
 def main() -> None:
     """Inject version build flags into PlatformIO environment."""
     build_version = get_git_version()
@@ -77,20 +202,20 @@ def main() -> None:
     firmware_version = get_firmware_version()
 
     # Set environment variables for ESP-IDF build system
-    import os
     os.environ["PROJECT_VER"] = firmware_version
 
     env.Append(  # noqa: F821
         CPPDEFINES=[
             ("BUILD_VERSION", f'\\"{build_version}\\"'),
             ("BUILD_COMMIT", f'\\"{build_commit}\\"'),
-            ("BUILD_ID", f'\\"{build_id}\\"'),
             # Set ESP-IDF app descriptor version - this is critical for OTA version display
             ("PROJECT_VER", f'\\"{firmware_version}\\"'),
             ("APP_PROJECT_VER", f'\\"{firmware_version}\\"'),
         ]
     )
     
+    write_build_info_header(build_id)
+
     # Set PROJECT_VER in PlatformIO environment for ESP-IDF CMake
     env.Replace(PROJECT_VER=firmware_version)
     
@@ -2,11 +2,14 @@
 PlatformIO pre-script to add simulation source files.
 
 This script is executed by PlatformIO's SCons build system which injects
-the 'Import' function and 'env' object at runtime.
+the 'Import' function and 'env' object at runtime. Set LMWB_VERBOSE=1 to
+print what was added.
 """
 # pylint: disable=undefined-variable,used-before-assignment
 # pyright: reportUndefinedVariable=false, reportUnboundVariable=false
 # mypy: disable-error-code="name-defined"
+import os
+import sys
 from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
@@ -18,22 +21,17 @@ env: "Environment"  # noqa: F821
 
 Import("env")  # noqa: F821
 
-# Add simulation main, common utilities, and globals to the build
+# Shared source lists live in scripts/
+_scripts_dir = os.path.join(env.subst("$PROJECT_DIR"), "scripts")  # noqa: F821
+if _scripts_dir not in sys.path:
+    sys.path.insert(0, _scripts_dir)
+
+from _envlib import log  # noqa: E402
+from _native_sources import BASE_SOURCES  # noqa: E402
+
+# Add simulation main, common utilities, and config domain files to the build
 env.Append(  # noqa: F821
-    SRC_FILTER=[
-        "+<../simulation/main_sim.cpp>",
-        # Common utilities needed for tests
-        "+<common/nvs_utils.cpp>",
-        # Config domain files
-        "+<config/config_manager.cpp>",
-        "+<config/config_wifi.cpp>",
-        "+<config/config_display.cpp>",
-        "+<config/config_webex.cpp>",
-        "+<config/config_mqtt.cpp>",
-        "+<config/config_supabase.cpp>",
-        "+<config/config_time.cpp>",
-        "+<config/config_export.cpp>",
-    ]
+    SRC_FILTER=["+<../simulation/main_sim.cpp>", *BASE_SOURCES]
 )
 
-print("[SIM] Added simulation sources, utilities and config to build")
+log("[SIM] Added simulation sources, utilities and config to build")
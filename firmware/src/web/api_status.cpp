@@ -16,6 +16,14 @@
 #include <esp_ota_ops.h>
 #include <LittleFS.h>
 
+// BUILD_ID lives in a header generated by scripts/version.py in the build
+// directory so a new build timestamp only recompiles this file
+#if __has_include("build_info.h")
+#include "build_info.h"
+#else
+#error "build_info.h not found: scripts/version.py must run as a pre: extra script"
+#endif
+
 namespace {
 void addPartitionInfo(JsonObject& partitions, const char* label,
                       esp_partition_subtype_t subtype,
@@ -155,11 +163,7 @@ void WebServerManager::handleStatus(AsyncWebServerRequest* request) {
     doc["firmware_version"] = "unknown";
     #endif
 
-    #ifdef BUILD_ID
     doc["firmware_build_id"] = BUILD_ID;
-    #else
-    doc["firmware_build_id"] = "unknown";
-    #endif
 
     // Use helper to send JSON response with CORS
     sendJsonResponse(request, 200, doc, [this](AsyncWebServerResponse* r) { addCorsHeaders(r); });
@@ -7,18 +7,103 @@ Analyzes Python, TypeScript/JavaScript, C/C++, and shell scripts.
 """
 
 import argparse
+import hashlib
+import json
 import logging
+import os
 import re
 import sys
-from dataclasses import dataclass, field
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
 from enum import Enum
+from itertools import chain, repeat
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+try:
+    import ahocorasick  # optional: pip install pyahocorasick
+except ImportError:
+    ahocorasick = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
 
+# Hyperscan is opt-in: CODE_REVIEW_HYPERSCAN=1 with the hyperscan package
+hyperscan = None
+if os.environ.get("CODE_REVIEW_HYPERSCAN") == "1":
+    try:
+        import hyperscan
+    except ImportError:
+        logger.warning("CODE_REVIEW_HYPERSCAN=1 but hyperscan is not installed")
+
+# Per-line patterns, compiled once at import
+# Matched against uppercased text, after a plain substring check for a tag
+_TODO_TAGS = ("TODO", "FIXME", "HACK", "XXX")
+_TODO_RE = re.compile(r"\b(TODO|FIXME|HACK|XXX)\b")
+_BARE_EXCEPT_RE = re.compile(r"^\s*except\s*:")
+_DEF_OR_CLASS_RE = re.compile(r"^\s*(?:def\s+\w+\s*\(|class\s+\w+)")
+_CONSOLE_RE = re.compile(r"\bconsole\.(log|debug|info)\s*\(")
+_ANY_TYPE_RE = re.compile(r":\s*any\b")
+_LOOSE_EQUALITY_RE = re.compile(r"[^=!<>]==[^=]")
+_MALLOC_RE = re.compile(r"\bmalloc\s*\(")
+_FREE_RE = re.compile(r"\bfree\s*\(")
+_UNQUOTED_VAR_RE = re.compile(r'[^"]\$\w+[^"]')
+_NEWLINE_RE = re.compile("\n")
+
+
+def _call_alternation(names) -> "re.Pattern[str]":
+    """One pattern matching a call to any of `names`; m.lastgroup is the name.
+
+    Whitespace before "(" may not cross a newline, so scanning the whole
+    file finds exactly the calls a line-by-line scan would.
+    """
+    alternatives = "|".join(f"(?P<{name}>{re.escape(name)})" for name in names)
+    return re.compile(rf"\b(?:{alternatives})[^\S\n]*\(")
+
+
+def _newline_offsets(text: str) -> List[int]:
+    """Offsets of every newline in `text`, in order."""
+    return [match.start() for match in _NEWLINE_RE.finditer(text)]
+
+
+def _hyperscan_prefilter(patterns) -> Optional[Any]:
+    """Hyperscan database over `patterns`, or None when Hyperscan is not enabled.
+
+    Compiled in prefilter mode: it may flag text the `re` patterns reject
+    (e.g. where it cannot honour \\b) but never misses a real match, so
+    its hits only pick what the `re` patterns then check.
+    """
+    if hyperscan is None:
+        return None
+    flags = [
+        hyperscan.HS_FLAG_UTF8
+        | hyperscan.HS_FLAG_UCP
+        | hyperscan.HS_FLAG_PREFILTER
+        | (hyperscan.HS_FLAG_CASELESS if pattern.flags & re.IGNORECASE else 0)
+        for pattern in patterns
+    ]
+    database = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    database.compile(
+        expressions=[pattern.pattern.encode("utf-8") for pattern in patterns],
+        ids=list(range(len(flags))),
+        elements=len(flags),
+        flags=flags,
+    )
+    return database
+
+
+def _literal_automaton(words) -> Optional[Any]:
+    """Aho-Corasick automaton yielding each of `words`, or None without pyahocorasick."""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for word in words:
+        automaton.add_word(word, word)
+    automaton.make_automaton()
+    return automaton
+
 
 class Severity(Enum):
     """Issue severity levels"""
@@ -58,42 +143,63 @@ class ReviewResult:
     file_path: Path
     issues: List[Issue] = field(default_factory=list)
     stats: Dict[str, Any] = field(default_factory=dict)
+    severity_counts: Dict[Severity, int] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        """Count the severities of any issues passed in"""
+        self.severity_counts = dict.fromkeys(Severity, 0)
+        for issue in self.issues:
+            self.severity_counts[issue.severity] += 1
 
     def add_issue(self, issue: Issue) -> None:
         """Add an issue to the review results"""
         self.issues.append(issue)
+        self.severity_counts[issue.severity] += 1
+
+    def get_count(self, severity: Severity) -> int:
+        """Get count of issues with the given severity"""
+        return self.severity_counts[severity]
 
     def get_critical_count(self) -> int:
         """Get count of critical issues"""
-        return sum(1 for issue in self.issues if issue.severity == Severity.CRITICAL)
+        return self.severity_counts[Severity.CRITICAL]
 
     def get_high_count(self) -> int:
         """Get count of high severity issues"""
-        return sum(1 for issue in self.issues if issue.severity == Severity.HIGH)
+        return self.severity_counts[Severity.HIGH]
 
 
 class CodeReviewer:
     """Base class for code reviewers"""
 
-    # Security patterns - common across languages
+    # Stripped lines starting with one of these count as comments
+    COMMENT_PREFIXES: Tuple[str, ...] = ()
+
+    # Security patterns - common across languages; matched against
+    # lowercased text instead of asking the engine to ignore case
     SECURITY_PATTERNS = {
         "hardcoded_password": (
-            r'(password|passwd|pwd)\s*=\s*["\'][\w!@#$%^&*()]+["\']',
+            re.compile(r'(password|passwd|pwd)\s*=\s*["\'][\w!@#$%^&*()]+["\']'),
             "Hardcoded password detected",
         ),
         "hardcoded_api_key": (
-            r'(api_key|apikey|access_key|secret_key)\s*=\s*["\'][A-Za-z0-9_\-]+["\']',
+            re.compile(
+                r'(api_key|apikey|access_key|secret_key)\s*=\s*["\'][a-z0-9_\-]+["\']'
+            ),
             "Hardcoded API key detected",
         ),
         "hardcoded_token": (
-            r'(token|auth_token|bearer)\s*=\s*["\'][A-Za-z0-9_\-\.]+["\']',
+            re.compile(r'(token|auth_token|bearer)\s*=\s*["\'][a-z0-9_\-\.]+["\']'),
             "Hardcoded token detected",
         ),
         "sql_injection": (
-            r"(execute|query|sql)\s*\([^)]*\+[^)]*\)",
+            re.compile(r"(execute|query|sql)\s*\([^)]*\+[^)]*\)"),
             "Potential SQL injection vulnerability (string concatenation)",
         ),
-        "eval_usage": (r"\beval\s*\(", "Use of eval() - potential code injection risk"),
+        "eval_usage": (
+            re.compile(r"\beval\s*\("),
+            "Use of eval() - potential code injection risk",
+        ),
     }
 
     # Known weak crypto algorithms
@@ -109,93 +215,248 @@ class CodeReviewer:
         "rc4",
         "blowfish",
     }
+    # Zero-width so overlapping names (e.g. "3des" and "des") are all found
+    _WEAK_CRYPTO_RE = re.compile(
+        "(?=(" + "|".join(re.escape(algo) for algo in sorted(WEAK_CRYPTO)) + "))"
+    )
+    _WEAK_CRYPTO_AC = _literal_automaton(WEAK_CRYPTO)
+    _SECURITY_HS = _hyperscan_prefilter(
+        [pattern for pattern, _ in SECURITY_PATTERNS.values()]
+    )
 
     def __init__(self, file_path: Path):
         self.file_path = file_path
         self.result = ReviewResult(file_path=file_path)
-        self.lines: List[str] = []
         self.content: str = ""
+        self._newlines: List[int] = []
+        self._non_empty_lines = 0
+        self._comment_lines = 0
 
     def read_file(self) -> bool:
         """Read file content"""
         try:
             with open(self.file_path, "r", encoding="utf-8") as f:
                 self.content = f.read()
-                self.lines = self.content.split("\n")
+            self._newlines = _newline_offsets(self.content)
             return True
         except Exception as e:
             logger.error(f"Failed to read {self.file_path}: {e}")
             return False
 
-    def check_security(self) -> None:
-        """Check for security issues"""
-        # Check for hardcoded secrets
-        for line_num, line in enumerate(self.lines, 1):
-            line_lower = line.lower()
+    def _line_number(self, pos: int, newlines: Optional[List[int]] = None) -> int:
+        """1-based line number of offset `pos`, by default in the file content."""
+        return bisect_right(self._newlines if newlines is None else newlines, pos) + 1
+
+    def _find_names(
+        self, pattern: "re.Pattern[str]", automaton: Optional[Any] = None
+    ) -> Dict[int, List[str]]:
+        """Scan the whole file once; map line number -> matched names in order.
+
+        With an automaton over the names, only the places it finds a name
+        are tried against `pattern`.
+        """
+        content = self.content
+        if automaton is not None:
+            starts = (end - len(name) + 1 for end, name in automaton.iter(content))
+            matches = filter(None, (pattern.match(content, start) for start in starts))
+        else:
+            matches = pattern.finditer(content)
+        hits: Dict[int, List[str]] = {}
+        for match in matches:
+            names = hits.setdefault(self._line_number(match.start()), [])
+            if match.lastgroup not in names:
+                names.append(match.lastgroup)
+        return hits
+
+    def _prefilter_lines(self, database: Any, text: str) -> Set[int]:
+        """Line numbers on which a Hyperscan prefilter match in `text` ends."""
+        data = text.encode("utf-8")
+        newlines = [match.start() for match in re.finditer(b"\n", data)]
+        lines: Set[int] = set()
+
+        def on_match(pattern_id, start, end, flags, context):
+            lines.add(bisect_right(newlines, end - 1) + 1)
+
+        database.scan(data, match_event_handler=on_match)
+        return lines
+
+    def _iter_lines(self) -> Iterator[str]:
+        """The file's lines, sliced one at a time using the newline index."""
+        content = self.content
+        start = 0
+        for end in self._newlines:
+            yield content[start:end]
+            start = end + 1
+        yield content[start:]
+
+    def _long_lines(self, max_length: int) -> List[Tuple[int, int]]:
+        """(line number, length) of every line longer than `max_length`."""
+        newlines = self._newlines
+        ends = chain(newlines, (len(self.content),))
+        starts = chain((0,), (pos + 1 for pos in newlines))
+        return [
+            (line_num, end - start)
+            for line_num, (start, end) in enumerate(zip(starts, ends), 1)
+            if end - start > max_length
+        ]
+
+    def _weak_crypto_lines(self, content_lower: str) -> Dict[int, Set[str]]:
+        """Map line number -> weak crypto names on that line."""
+        # Weak crypto names are plain substrings, so find them all in one pass
+        # Lowercasing can change the length of some non-ASCII text
+        if len(content_lower) == len(self.content):
+            newlines = self._newlines
+        else:
+            newlines = _newline_offsets(content_lower)
+        weak_crypto: Dict[int, Set[str]] = {}
+        if self._WEAK_CRYPTO_AC is not None:
+            hits = (
+                (end - len(algo) + 1, algo)
+                for end, algo in self._WEAK_CRYPTO_AC.iter(content_lower)
+            )
+        else:
+            hits = (
+                (match.start(), match.group(1))
+                for match in self._WEAK_CRYPTO_RE.finditer(content_lower)
+            )
+        for start, algo in hits:
+            line_num = self._line_number(start, newlines)
+            weak_crypto.setdefault(line_num, set()).add(algo)
+        return weak_crypto
+
+    def _scan_lines(self) -> None:
+        """Walk the file once, feeding every per-line check.
+
+        Each check collects into its own list and the lists are reported in
+        check order, so results read as if every check had its own pass.
+        """
+        content = self.content
+        content_lower = content.lower()
+        weak_crypto = self._weak_crypto_lines(content_lower)
+        if self._SECURITY_HS is not None:
+            # Any match of a secret pattern on a line ends on that line
+            secret_lines: Optional[Set[int]] = self._prefilter_lines(
+                self._SECURITY_HS, content_lower
+            )
+            check_secrets = bool(secret_lines)
+        else:
+            # A pattern that matches no line cannot match the file either, so one
+            # whole-file search per pattern decides whether lines need checking
+            secret_lines = None
+            check_secrets = any(
+                pattern.search(content_lower)
+                for pattern, _ in self.SECURITY_PATTERNS.values()
+            )
+        content_upper = content.upper()
+        check_todo = any(tag in content_upper for tag in _TODO_TAGS)
+        del content_upper
+        max_line_length = 120
 
-            # Check security patterns
-            for pattern_name, (pattern, message) in self.SECURITY_PATTERNS.items():
-                if re.search(pattern, line, re.IGNORECASE):
-                    self.result.add_issue(
-                        Issue(
-                            category=Category.SECURITY,
-                            severity=Severity.CRITICAL,
-                            message=message,
-                            line_number=line_num,
-                            line_content=line.strip(),
-                            recommendation="Use environment variables or secure vault instead",
+        security: List[Issue] = []
+        # Line length needs no line text, so it comes straight from the index
+        long_lines = [
+            Issue(
+                category=Category.CODE_QUALITY,
+                severity=Severity.LOW,
+                message=f"Line too long ({length} characters, max {max_line_length})",
+                line_number=line_num,
+                recommendation="Break long lines for readability",
+            )
+            for line_num, length in self._long_lines(max_line_length)
+        ]
+        todos: List[Issue] = []
+        language_issues = self._begin_scan()
+        non_empty_lines = comment_lines = 0
+
+        # Bound once: these are looked up on every line otherwise
+        secret_patterns = list(self.SECURITY_PATTERNS.values())
+        comment_prefixes = self.COMMENT_PREFIXES
+        check_line = self._check_line
+
+        for line_num, line in enumerate(self._iter_lines(), 1):
+            stripped = line.strip()
+            if stripped:
+                non_empty_lines += 1
+                if stripped.startswith(comment_prefixes):
+                    comment_lines += 1
+
+            # Check for hardcoded secrets
+            if check_secrets and (secret_lines is None or line_num in secret_lines):
+                line_lower = line.lower()
+                for pattern, message in secret_patterns:
+                    if pattern.search(line_lower):
+                        security.append(
+                            Issue(
+                                category=Category.SECURITY,
+                                severity=Severity.CRITICAL,
+                                message=message,
+                                line_number=line_num,
+                                line_content=stripped,
+                                recommendation="Use environment variables or secure vault instead",
+                            )
                         )
-                    )
 
             # Check for weak crypto algorithms
-            for weak_algo in self.WEAK_CRYPTO:
-                if weak_algo in line_lower:
-                    self.result.add_issue(
+            weak_algos = weak_crypto.get(line_num)
+            if weak_algos:
+                for weak_algo in sorted(weak_algos):
+                    security.append(
                         Issue(
                             category=Category.SECURITY,
                             severity=Severity.HIGH,
                             message=f"Weak cryptographic algorithm detected: {weak_algo}",
                             line_number=line_num,
-                            line_content=line.strip(),
+                            line_content=stripped,
                             recommendation="Use SHA-256, SHA-384, SHA-512, AES-256-GCM, or ChaCha20",
                         )
                     )
 
-    def check_code_quality(self) -> None:
-        """Check basic code quality issues"""
-        # Check line length
-        max_line_length = 120
-        for line_num, line in enumerate(self.lines, 1):
-            if len(line) > max_line_length:
-                self.result.add_issue(
-                    Issue(
-                        category=Category.CODE_QUALITY,
-                        severity=Severity.LOW,
-                        message=f"Line too long ({len(line)} characters, max {max_line_length})",
-                        line_number=line_num,
-                        recommendation="Break long lines for readability",
+            # Check for TODO/FIXME comments
+            if check_todo:
+                line_upper = line.upper()
+                if (
+                    "TODO" in line_upper
+                    or "FIXME" in line_upper
+                    or "HACK" in line_upper
+                    or "XXX" in line_upper
+                ) and _TODO_RE.search(line_upper):
+                    todos.append(
+                        Issue(
+                            category=Category.CODE_QUALITY,
+                            severity=Severity.INFO,
+                            message="Unresolved TODO/FIXME comment",
+                            line_number=line_num,
+                            line_content=stripped,
+                        )
                     )
-                )
 
-        # Check for TODO/FIXME comments
-        for line_num, line in enumerate(self.lines, 1):
-            if re.search(r"\b(TODO|FIXME|HACK|XXX)\b", line, re.IGNORECASE):
-                self.result.add_issue(
-                    Issue(
-                        category=Category.CODE_QUALITY,
-                        severity=Severity.INFO,
-                        message="Unresolved TODO/FIXME comment",
-                        line_number=line_num,
-                        line_content=line.strip(),
-                    )
-                )
+            check_line(line_num, line, stripped)
+
+        self._end_scan()
+        for issues in (security, long_lines, todos, *language_issues):
+            for issue in issues:
+                self.result.add_issue(issue)
+        self._non_empty_lines = non_empty_lines
+        self._comment_lines = comment_lines
+
+    def _begin_scan(self) -> List[List[Issue]]:
+        """Prepare language-specific line checks; return their issue lists in report order"""
+        return []
+
+    def _check_line(self, line_num: int, line: str, stripped: str) -> None:
+        """Language-specific checks for one line - to be implemented by subclasses"""
+        pass
+
+    def _end_scan(self) -> None:
+        """Flush line checks that look ahead - to be implemented by subclasses"""
+        pass
 
     def calculate_stats(self) -> None:
         """Calculate file statistics"""
         self.result.stats = {
-            "total_lines": len(self.lines),
-            "non_empty_lines": sum(1 for line in self.lines if line.strip()),
-            "comment_lines": 0,  # Subclass-specific
+            "total_lines": len(self._newlines) + 1,
+            "non_empty_lines": self._non_empty_lines,
+            "comment_lines": self._comment_lines,
         }
 
     def review(self) -> ReviewResult:
@@ -203,133 +464,150 @@ class CodeReviewer:
         if not self.read_file():
             return self.result
 
-        self.check_security()
-        self.check_code_quality()
+        self._scan_lines()
         self.check_functionality()
         self.calculate_stats()
 
         return self.result
 
     def check_functionality(self) -> None:
-        """Check functionality - to be implemented by subclasses"""
+        """Whole-file functionality checks - to be implemented by subclasses"""
         pass
 
 
 class PythonReviewer(CodeReviewer):
     """Python-specific code reviewer"""
 
-    def check_functionality(self) -> None:
+    COMMENT_PREFIXES = ("#",)
+
+    def _begin_scan(self) -> List[List[Issue]]:
+        """Prepare Python-specific line checks"""
+        self._check_except = "except" in self.content
+        self._check_defs = "def" in self.content or "class" in self.content
+        # (line number, stripped line, lines left to search) of the last
+        # def/class whose docstring has not been found yet
+        self._pending_def: Optional[tuple] = None
+        self._bare_excepts: List[Issue] = []
+        self._missing_docstrings: List[Issue] = []
+        return [self._bare_excepts, self._missing_docstrings]
+
+    def _check_line(self, line_num: int, line: str, stripped: str) -> None:
         """Check Python-specific functionality issues"""
         # Check for bare except clauses
-        for line_num, line in enumerate(self.lines, 1):
-            if re.search(r"^\s*except\s*:", line):
-                self.result.add_issue(
-                    Issue(
-                        category=Category.FUNCTIONALITY,
-                        severity=Severity.MEDIUM,
-                        message="Bare except clause - catches all exceptions",
-                        line_number=line_num,
-                        line_content=line.strip(),
-                        recommendation="Catch specific exception types",
-                    )
+        if self._check_except and "except" in line and _BARE_EXCEPT_RE.match(line):
+            self._bare_excepts.append(
+                Issue(
+                    category=Category.FUNCTIONALITY,
+                    severity=Severity.MEDIUM,
+                    message="Bare except clause - catches all exceptions",
+                    line_number=line_num,
+                    line_content=stripped,
+                    recommendation="Catch specific exception types",
                 )
+            )
 
         # Check for missing docstrings on functions/classes
-        function_pattern = r"^\s*def\s+(\w+)\s*\("
-        class_pattern = r"^\s*class\s+(\w+)"
-
-        for line_num, line in enumerate(self.lines, 1):
-            if re.search(function_pattern, line) or re.search(class_pattern, line):
+        if self._check_defs:
+            if self._pending_def is not None:
                 # Check if next non-empty line is a docstring
-                has_docstring = False
-                for next_line in self.lines[line_num : line_num + 3]:
-                    if next_line.strip().startswith(
-                        '"""'
-                    ) or next_line.strip().startswith("'''"):
-                        has_docstring = True
-                        break
-                    if next_line.strip() and not next_line.strip().startswith("#"):
-                        break
-
-                if not has_docstring and not line.strip().startswith("def __"):
-                    self.result.add_issue(
-                        Issue(
-                            category=Category.CODE_QUALITY,
-                            severity=Severity.LOW,
-                            message="Missing docstring",
-                            line_number=line_num,
-                            line_content=line.strip(),
-                            recommendation="Add docstring describing purpose and parameters",
-                        )
-                    )
-
-    def calculate_stats(self) -> None:
-        """Calculate Python-specific statistics"""
-        super().calculate_stats()
-        comment_lines = sum(1 for line in self.lines if line.strip().startswith("#"))
-        self.result.stats["comment_lines"] = comment_lines
+                def_num, def_line, remaining = self._pending_def
+                if stripped.startswith('"""') or stripped.startswith("'''"):
+                    self._pending_def = None
+                elif (stripped and not stripped.startswith("#")) or remaining == 1:
+                    self._pending_def = None
+                    self._missing_docstring(def_num, def_line)
+                else:
+                    self._pending_def = (def_num, def_line, remaining - 1)
+
+            if ("def" in line or "class" in line) and _DEF_OR_CLASS_RE.match(line):
+                # Dunder methods are exempt, so there is nothing to look for
+                if stripped.startswith("def __"):
+                    self._pending_def = None
+                else:
+                    self._pending_def = (line_num, stripped, 3)
+
+    def _end_scan(self) -> None:
+        """Report a trailing def/class that never got its docstring"""
+        if self._pending_def is not None:
+            def_num, def_line, _ = self._pending_def
+            self._pending_def = None
+            self._missing_docstring(def_num, def_line)
+
+    def _missing_docstring(self, line_num: int, stripped: str) -> None:
+        """Record a def/class without a docstring"""
+        self._missing_docstrings.append(
+            Issue(
+                category=Category.CODE_QUALITY,
+                severity=Severity.LOW,
+                message="Missing docstring",
+                line_number=line_num,
+                line_content=stripped,
+                recommendation="Add docstring describing purpose and parameters",
+            )
+        )
 
 
 class TypeScriptReviewer(CodeReviewer):
     """TypeScript/JavaScript-specific code reviewer"""
 
-    def check_functionality(self) -> None:
+    COMMENT_PREFIXES = ("//", "/*")
+
+    def _begin_scan(self) -> List[List[Issue]]:
+        """Prepare TypeScript-specific line checks"""
+        self._check_console = "console." in self.content
+        self._check_any = "any" in self.content
+        self._check_equality = "==" in self.content
+        self._consoles: List[Issue] = []
+        self._any_types: List[Issue] = []
+        self._loose_equalities: List[Issue] = []
+        return [self._consoles, self._any_types, self._loose_equalities]
+
+    def _check_line(self, line_num: int, line: str, stripped: str) -> None:
         """Check TypeScript-specific functionality issues"""
         # Check for console.log in production code
-        for line_num, line in enumerate(self.lines, 1):
-            if re.search(r"\bconsole\.(log|debug|info)\s*\(", line):
-                self.result.add_issue(
-                    Issue(
-                        category=Category.CODE_QUALITY,
-                        severity=Severity.LOW,
-                        message="Console statement found - should use proper logging",
-                        line_number=line_num,
-                        line_content=line.strip(),
-                        recommendation="Use proper logging framework or remove before production",
-                    )
+        if self._check_console and _CONSOLE_RE.search(line):
+            self._consoles.append(
+                Issue(
+                    category=Category.CODE_QUALITY,
+                    severity=Severity.LOW,
+                    message="Console statement found - should use proper logging",
+                    line_number=line_num,
+                    line_content=stripped,
+                    recommendation="Use proper logging framework or remove before production",
                 )
+            )
 
         # Check for any type usage
-        for line_num, line in enumerate(self.lines, 1):
-            if re.search(r":\s*any\b", line):
-                self.result.add_issue(
-                    Issue(
-                        category=Category.CODE_QUALITY,
-                        severity=Severity.MEDIUM,
-                        message="Use of 'any' type - loses type safety",
-                        line_number=line_num,
-                        line_content=line.strip(),
-                        recommendation="Use specific types or unknown instead of any",
-                    )
+        if self._check_any and _ANY_TYPE_RE.search(line):
+            self._any_types.append(
+                Issue(
+                    category=Category.CODE_QUALITY,
+                    severity=Severity.MEDIUM,
+                    message="Use of 'any' type - loses type safety",
+                    line_number=line_num,
+                    line_content=stripped,
+                    recommendation="Use specific types or unknown instead of any",
                 )
+            )
 
         # Check for == instead of ===
-        for line_num, line in enumerate(self.lines, 1):
-            if re.search(r"[^=!<>]==[^=]", line):
-                self.result.add_issue(
-                    Issue(
-                        category=Category.CODE_QUALITY,
-                        severity=Severity.LOW,
-                        message="Use === instead of == for type-safe comparison",
-                        line_number=line_num,
-                        line_content=line.strip(),
-                    )
+        if self._check_equality and _LOOSE_EQUALITY_RE.search(line):
+            self._loose_equalities.append(
+                Issue(
+                    category=Category.CODE_QUALITY,
+                    severity=Severity.LOW,
+                    message="Use === instead of == for type-safe comparison",
+                    line_number=line_num,
+                    line_content=stripped,
                 )
-
-    def calculate_stats(self) -> None:
-        """Calculate TypeScript-specific statistics"""
-        super().calculate_stats()
-        comment_lines = sum(
-            1
-            for line in self.lines
-            if line.strip().startswith("//") or line.strip().startswith("/*")
-        )
-        self.result.stats["comment_lines"] = comment_lines
+            )
 
 
 class CppReviewer(CodeReviewer):
     """C/C++-specific code reviewer"""
 
+    COMMENT_PREFIXES = ("//", "/*")
+
     # Deprecated OpenSSL functions
     DEPRECATED_OPENSSL = {
         "AES_encrypt",
@@ -344,51 +622,69 @@ class CppReviewer(CodeReviewer):
         "AES_wrap_key",
         "AES_unwrap_key",
     }
+    _DEPRECATED_OPENSSL_RE = _call_alternation(sorted(DEPRECATED_OPENSSL))
+    _DEPRECATED_OPENSSL_AC = _literal_automaton(DEPRECATED_OPENSSL)
+
+    # Unsafe C functions and their safer replacements
+    UNSAFE_FUNCTIONS = {
+        "strcpy": "Use strncpy or strlcpy instead",
+        "strcat": "Use strncat or strlcat instead",
+        "sprintf": "Use snprintf instead",
+        "gets": "Use fgets instead",
+        "scanf": "Use with format width limits",
+    }
+    _UNSAFE_FUNCTION_RE = _call_alternation(UNSAFE_FUNCTIONS)
+    _UNSAFE_FUNCTION_AC = _literal_automaton(UNSAFE_FUNCTIONS)
+    _UNSAFE_ORDER = {func: index for index, func in enumerate(UNSAFE_FUNCTIONS)}
+
+    def _begin_scan(self) -> List[List[Issue]]:
+        """Find unsafe and deprecated calls for the line scan to report"""
+        self._unsafe_hits = self._find_names(
+            self._UNSAFE_FUNCTION_RE, self._UNSAFE_FUNCTION_AC
+        )
+        self._deprecated_hits = self._find_names(
+            self._DEPRECATED_OPENSSL_RE, self._DEPRECATED_OPENSSL_AC
+        )
+        self._unsafe_calls: List[Issue] = []
+        self._deprecated_calls: List[Issue] = []
+        return [self._unsafe_calls, self._deprecated_calls]
 
-    def check_functionality(self) -> None:
+    def _check_line(self, line_num: int, line: str, stripped: str) -> None:
         """Check C/C++-specific functionality issues"""
         # Check for unsafe functions
-        unsafe_functions = {
-            "strcpy": "Use strncpy or strlcpy instead",
-            "strcat": "Use strncat or strlcat instead",
-            "sprintf": "Use snprintf instead",
-            "gets": "Use fgets instead",
-            "scanf": "Use with format width limits",
-        }
-
-        for line_num, line in enumerate(self.lines, 1):
-            for func, recommendation in unsafe_functions.items():
-                if re.search(rf"\b{func}\s*\(", line):
-                    self.result.add_issue(
-                        Issue(
-                            category=Category.SECURITY,
-                            severity=Severity.HIGH,
-                            message=f"Unsafe function: {func}()",
-                            line_number=line_num,
-                            line_content=line.strip(),
-                            recommendation=recommendation,
-                        )
+        funcs = self._unsafe_hits.get(line_num)
+        if funcs:
+            for func in sorted(funcs, key=self._UNSAFE_ORDER.__getitem__):
+                self._unsafe_calls.append(
+                    Issue(
+                        category=Category.SECURITY,
+                        severity=Severity.HIGH,
+                        message=f"Unsafe function: {func}()",
+                        line_number=line_num,
+                        line_content=stripped,
+                        recommendation=self.UNSAFE_FUNCTIONS[func],
                     )
+                )
 
         # Check for deprecated OpenSSL functions
-        for line_num, line in enumerate(self.lines, 1):
-            for deprecated_func in self.DEPRECATED_OPENSSL:
-                if re.search(rf"\b{deprecated_func}\s*\(", line):
-                    self.result.add_issue(
-                        Issue(
-                            category=Category.SECURITY,
-                            severity=Severity.HIGH,
-                            message=f"Deprecated OpenSSL function: {deprecated_func}()",
-                            line_number=line_num,
-                            line_content=line.strip(),
-                            recommendation="Use EVP high-level APIs instead",
-                        )
-                    )
+        for deprecated_func in self._deprecated_hits.get(line_num, ()):
+            self._deprecated_calls.append(
+                Issue(
+                    category=Category.SECURITY,
+                    severity=Severity.HIGH,
+                    message=f"Deprecated OpenSSL function: {deprecated_func}()",
+                    line_number=line_num,
+                    line_content=stripped,
+                    recommendation="Use EVP high-level APIs instead",
+                )
+            )
 
+    def check_functionality(self) -> None:
+        """Check C/C++-specific functionality issues"""
         # Check for malloc without free
-        malloc_pattern = r"\bmalloc\s*\("
-        if re.search(malloc_pattern, self.content):
-            if not re.search(r"\bfree\s*\(", self.content):
+        content = self.content
+        if "malloc" in content and _MALLOC_RE.search(content):
+            if "free" not in content or not _FREE_RE.search(content):
                 self.result.add_issue(
                     Issue(
                         category=Category.FUNCTIONALITY,
@@ -398,37 +694,35 @@ class CppReviewer(CodeReviewer):
                     )
                 )
 
-    def calculate_stats(self) -> None:
-        """Calculate C/C++-specific statistics"""
-        super().calculate_stats()
-        comment_lines = sum(
-            1
-            for line in self.lines
-            if line.strip().startswith("//") or line.strip().startswith("/*")
-        )
-        self.result.stats["comment_lines"] = comment_lines
-
 
 class ShellReviewer(CodeReviewer):
     """Shell script-specific code reviewer"""
 
-    def check_functionality(self) -> None:
+    COMMENT_PREFIXES = ("#",)
+
+    def _begin_scan(self) -> List[List[Issue]]:
+        """Prepare shell-specific line checks"""
+        self._unquoted_vars: List[Issue] = []
+        return [self._unquoted_vars]
+
+    def _check_line(self, line_num: int, line: str, stripped: str) -> None:
         """Check shell script-specific functionality issues"""
         # Check for unquoted variables
-        for line_num, line in enumerate(self.lines, 1):
-            # Look for $VAR not in quotes (simple heuristic)
-            if re.search(r'[^"]\$\w+[^"]', line) and "=" not in line:
-                self.result.add_issue(
-                    Issue(
-                        category=Category.FUNCTIONALITY,
-                        severity=Severity.LOW,
-                        message="Unquoted variable - may cause word splitting issues",
-                        line_number=line_num,
-                        line_content=line.strip(),
-                        recommendation='Use "$VAR" instead of $VAR',
-                    )
+        # Look for $VAR not in quotes (simple heuristic)
+        if "$" in line and "=" not in line and _UNQUOTED_VAR_RE.search(line):
+            self._unquoted_vars.append(
+                Issue(
+                    category=Category.FUNCTIONALITY,
+                    severity=Severity.LOW,
+                    message="Unquoted variable - may cause word splitting issues",
+                    line_number=line_num,
+                    line_content=stripped,
+                    recommendation='Use "$VAR" instead of $VAR',
                 )
+            )
 
+    def check_functionality(self) -> None:
+        """Check shell script-specific functionality issues"""
         # Check for missing error handling
         if "set -e" not in self.content and "set -o errexit" not in self.content:
             self.result.add_issue(
@@ -440,34 +734,27 @@ class ShellReviewer(CodeReviewer):
                 )
             )
 
-    def calculate_stats(self) -> None:
-        """Calculate shell script-specific statistics"""
-        super().calculate_stats()
-        comment_lines = sum(1 for line in self.lines if line.strip().startswith("#"))
-        self.result.stats["comment_lines"] = comment_lines
+
+_REVIEWER_BY_SUFFIX = {
+    ".py": PythonReviewer,
+    ".ts": TypeScriptReviewer,
+    ".tsx": TypeScriptReviewer,
+    ".js": TypeScriptReviewer,
+    ".jsx": TypeScriptReviewer,
+    ".cpp": CppReviewer,
+    ".cc": CppReviewer,
+    ".cxx": CppReviewer,
+    ".c": CppReviewer,
+    ".h": CppReviewer,
+    ".hpp": CppReviewer,
+    ".sh": ShellReviewer,
+    ".bash": ShellReviewer,
+}
 
 
 def get_reviewer(file_path: Path) -> Optional[CodeReviewer]:
     """Get appropriate reviewer for file type"""
-    suffix = file_path.suffix.lower()
-
-    reviewers = {
-        ".py": PythonReviewer,
-        ".ts": TypeScriptReviewer,
-        ".tsx": TypeScriptReviewer,
-        ".js": TypeScriptReviewer,
-        ".jsx": TypeScriptReviewer,
-        ".cpp": CppReviewer,
-        ".cc": CppReviewer,
-        ".cxx": CppReviewer,
-        ".c": CppReviewer,
-        ".h": CppReviewer,
-        ".hpp": CppReviewer,
-        ".sh": ShellReviewer,
-        ".bash": ShellReviewer,
-    }
-
-    reviewer_class = reviewers.get(suffix)
+    reviewer_class = _REVIEWER_BY_SUFFIX.get(file_path.suffix.lower())
     if reviewer_class:
         return reviewer_class(file_path)
 
@@ -530,62 +817,167 @@ def print_review_result(result: ReviewResult, verbose: bool = False) -> None:
     print(f"Summary: {len(result.issues)} total issues")
     print(f"  🔴 Critical: {critical_count}")
     print(f"  🟠 High: {high_count}")
-    print(
-        f"  🟡 Medium: {sum(1 for i in result.issues if i.severity == Severity.MEDIUM)}"
-    )
-    print(f"  🔵 Low: {sum(1 for i in result.issues if i.severity == Severity.LOW)}")
-    print(f"  ℹ️  Info: {sum(1 for i in result.issues if i.severity == Severity.INFO)}")
+    print(f"  🟡 Medium: {result.get_count(Severity.MEDIUM)}")
+    print(f"  🔵 Low: {result.get_count(Severity.LOW)}")
+    print(f"  ℹ️  Info: {result.get_count(Severity.INFO)}")
     print(f"{'='*80}\n")
 
 
-def review_file(file_path: Path, verbose: bool = False) -> ReviewResult:
-    """Review a single file"""
+# Reviews are cached here, one JSON file per reviewed file
+CACHE_DIR = Path(".code_review_cache")
+
+# Any change to this script invalidates every cached review
+_TOOL_VERSION = hashlib.blake2b(Path(__file__).read_bytes(), digest_size=8).hexdigest()
+
+
+def _cache_entry(file_path: Path) -> Optional[Tuple[Path, List[Any]]]:
+    """Cache file and key (path, mtime, size, tool version) for a file"""
+    try:
+        resolved = file_path.resolve()
+        stat = resolved.stat()
+    except OSError:
+        return None
+    key = [str(resolved), stat.st_mtime_ns, stat.st_size, _TOOL_VERSION]
+    name = hashlib.blake2b(str(resolved).encode("utf-8"), digest_size=16).hexdigest()
+    return CACHE_DIR / f"{name}.json", key
+
+
+def _load_cached_result(
+    cache_file: Path, key: List[Any], file_path: Path
+) -> Optional[ReviewResult]:
+    """Cached review for `key`, or None if missing or stale"""
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached["key"] != key:
+            return None
+        result = ReviewResult(file_path=file_path, stats=cached["stats"])
+        for issue in cached["issues"]:
+            issue["category"] = Category(issue["category"])
+            issue["severity"] = Severity(issue["severity"])
+            result.add_issue(Issue(**issue))
+        return result
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _store_cached_result(cache_file: Path, key: List[Any], result: ReviewResult) -> None:
+    """Write a review to the cache; failures only cost the next run a re-review"""
+    cached = {
+        "key": key,
+        "stats": result.stats,
+        "issues": [asdict(issue) for issue in result.issues],
+    }
+    tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+    try:
+        CACHE_DIR.mkdir(exist_ok=True)
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(cached, f, default=lambda value: value.value)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        logger.debug(f"Could not cache review of {result.file_path}: {e}")
+
+
+def review_file(
+    file_path: Path, verbose: bool = False, use_cache: bool = True
+) -> ReviewResult:
+    """Review a single file, reusing the cached result if it is unchanged"""
     reviewer = get_reviewer(file_path)
 
     if not reviewer:
         logger.warning(f"No reviewer available for {file_path.suffix} files")
         return ReviewResult(file_path=file_path)
 
-    return reviewer.review()
+    entry = _cache_entry(file_path) if use_cache else None
+    if entry:
+        cached = _load_cached_result(entry[0], entry[1], file_path)
+        if cached:
+            return cached
+
+    result = reviewer.review()
+    # Files that could not be read have no stats; review them again next time
+    if entry and result.stats:
+        _store_cached_result(entry[0], entry[1], result)
+    return result
+
+
+# Supported file types when walking a directory
+_SUPPORTED_EXTENSIONS = {
+    ".py",
+    ".ts",
+    ".tsx",
+    ".js",
+    ".jsx",
+    ".cpp",
+    ".cc",
+    ".c",
+    ".h",
+    ".hpp",
+    ".sh",
+    ".bash",
+}
+
+# Dependency, cache and build output directories, never descended into
+_SKIP_DIRS = {"node_modules", "__pycache__", ".git", "dist", "build"}
+
+
+def _iter_source_files(directory: Path, recursive: bool = True) -> Iterator[Path]:
+    """Yield supported files in `directory`, then in its subdirectories"""
+    subdirs = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive and entry.name not in _SKIP_DIRS:
+                            subdirs.append(directory / entry.name)
+                    elif (
+                        os.path.splitext(entry.name)[1].lower() in _SUPPORTED_EXTENSIONS
+                        and entry.is_file()
+                    ):
+                        yield directory / entry.name
+                except OSError:
+                    continue
+    except PermissionError:
+        return
+
+    for subdir in subdirs:
+        yield from _iter_source_files(subdir, recursive)
 
 
 def review_directory(
-    directory: Path, recursive: bool = True, verbose: bool = False
+    directory: Path,
+    recursive: bool = True,
+    verbose: bool = False,
+    jobs: Optional[int] = None,
+    use_cache: bool = True,
 ) -> List[ReviewResult]:
-    """Review all supported files in a directory"""
-    results = []
-
-    supported_extensions = {
-        ".py",
-        ".ts",
-        ".tsx",
-        ".js",
-        ".jsx",
-        ".cpp",
-        ".cc",
-        ".c",
-        ".h",
-        ".hpp",
-        ".sh",
-        ".bash",
-    }
-
-    if recursive:
-        pattern = "**/*"
-    else:
-        pattern = "*"
-
-    for file_path in directory.glob(pattern):
-        if file_path.is_file() and file_path.suffix.lower() in supported_extensions:
-            # Skip test files and node_modules
-            if "node_modules" in str(file_path) or "__pycache__" in str(file_path):
-                continue
-
-            logger.info(f"Reviewing {file_path}")
-            result = review_file(file_path, verbose)
-            results.append(result)
-
-    return results
+    """Review all supported files in a directory
+
+    Files are independent, so they are reviewed in `jobs` worker processes
+    (default: one per CPU); results keep the directory walk order.
+    """
+    file_paths = []
+    for file_path in _iter_source_files(directory, recursive):
+        logger.info(f"Reviewing {file_path}")
+        file_paths.append(file_path)
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(file_paths) < 2:
+        return [review_file(file_path, verbose, use_cache) for file_path in file_paths]
+
+    # Hand each worker several files per task to keep pickling overhead low
+    chunksize = max(1, len(file_paths) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(
+            executor.map(
+                review_file,
+                file_paths,
+                repeat(verbose),
+                repeat(use_cache),
+                chunksize=chunksize,
+            )
+        )
 
 
 def main() -> int:
@@ -622,6 +1014,20 @@ Examples:
         "--no-recursive", action="store_true", help="Do not review subdirectories"
     )
 
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="Number of files to review in parallel (default: CPU count)",
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Review every file even if unchanged since the last run (cache: {CACHE_DIR}/)",
+    )
+
     parser.add_argument(
         "--fail-on-critical",
         action="store_true",
@@ -645,11 +1051,13 @@ Examples:
     results: List[ReviewResult] = []
 
     if path.is_file():
-        result = review_file(path, args.verbose)
+        result = review_file(path, args.verbose, not args.no_cache)
         results.append(result)
         print_review_result(result, args.verbose)
     elif path.is_dir():
-        results = review_directory(path, not args.no_recursive, args.verbose)
+        results = review_directory(
+            path, not args.no_recursive, args.verbose, args.jobs, not args.no_cache
+        )
 
         for result in results:
             print_review_result(result, args.verbose)
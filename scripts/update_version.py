@@ -22,6 +22,17 @@ import json
 from pathlib import Path
 from typing import Optional
 
+# Match: firmware_version = 1.5.0 (with optional semicolon comment)
+# Also handle versions with prerelease suffixes like 1.5.0-alpha
+_PIO_RE = re.compile(rb'(firmware_version\s*=\s*)([\d.]+(?:-[a-zA-Z0-9.-]+)?)')
+
+# Match: **Current Version: 1.5.2**
+# Also handle versions with prerelease suffixes
+_README_RE = re.compile(rb'(\*\*Current Version:\s*)([\d.]+(?:-[a-zA-Z0-9.-]+)?)(\*\*)')
+
+# Semver-like: x.y.z or x.y.z-prerelease
+_SEMVER_RE = re.compile(r'^\d+\.\d+\.\d+(-[a-zA-Z0-9.-]+)?$')
+
 
 def update_platformio_version(version: str) -> bool:
     """Update version in firmware/platformio.ini."""
@@ -30,29 +41,21 @@ def update_platformio_version(version: str) -> bool:
         print(f"Warning: {ini_path} not found")
         return False
 
-    content = ini_path.read_text()
+    content = ini_path.read_bytes()
+    version_bytes = version.encode('utf-8')
     
-    # Match: firmware_version = 1.5.0 (with optional semicolon comment)
-    # Also handle versions with prerelease suffixes like 1.5.0-alpha
-    pattern = r'(firmware_version\s*=\s*)([\d.]+(?:-[a-zA-Z0-9.-]+)?)'
+    # Replace using lambda to avoid regex group reference issues
+    new_content, count = _PIO_RE.subn(lambda m: m.group(1) + version_bytes, content)
     
-    # Check if pattern matches
-    if not re.search(pattern, content):
+    if not count:
         print(f"Warning: Could not find firmware_version in {ini_path}")
         return False
     
-    # Replace using lambda to avoid regex group reference issues
-    new_content = re.sub(
-        pattern,
-        lambda m: m.group(1) + version,
-        content
-    )
-    
     if new_content == content:
         print(f"Warning: Version replacement didn't change content in {ini_path}")
         return False
     
-    ini_path.write_text(new_content)
+    ini_path.write_bytes(new_content)
     print(f"✓ Updated {ini_path}: firmware_version = {version}")
     return True
 
@@ -64,15 +67,15 @@ def update_package_json_version(package_path: Path, version: str) -> bool:
         return False
 
     try:
-        with open(package_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = json.loads(package_path.read_bytes())
         
         old_version = data.get('version', '')
         data['version'] = version
         
-        with open(package_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2)
-            f.write('\n')  # Add trailing newline
+        # Serialize in memory and write once, with npm's trailing newline;
+        # non-ASCII text stays as UTF-8 the way npm writes it
+        output = json.dumps(data, indent=2, ensure_ascii=False) + '\n'
+        package_path.write_bytes(output.encode('utf-8'))
         
         print(f"✓ Updated {package_path}: version = {version} (was {old_version})")
         return True
@@ -91,45 +94,41 @@ def update_readme_version(version: str) -> bool:
         print(f"Warning: {readme_path} not found")
         return False
 
-    content = readme_path.read_text()
-    
-    # Match: **Current Version: 1.5.2**
-    # Also handle versions with prerelease suffixes
-    pattern = r'(\*\*Current Version:\s*)([\d.]+(?:-[a-zA-Z0-9.-]+)?)(\*\*)'
-    
-    # Check if pattern matches
-    if not re.search(pattern, content):
-        print(f"Warning: Could not find 'Current Version' in {readme_path}")
-        return False
+    content = readme_path.read_bytes()
+    version_bytes = version.encode('utf-8')
     
     # Replace using lambda to avoid regex group reference issues
-    new_content = re.sub(
-        pattern,
-        lambda m: m.group(1) + version + m.group(3),
+    new_content, count = _README_RE.subn(
+        lambda m: m.group(1) + version_bytes + m.group(3),
         content
     )
     
+    if not count:
+        print(f"Warning: Could not find 'Current Version' in {readme_path}")
+        return False
+    
     if new_content == content:
         print(f"Warning: Version replacement didn't change content in {readme_path}")
         return False
     
-    readme_path.write_text(new_content)
+    readme_path.write_bytes(new_content)
     print(f"✓ Updated {readme_path}: Current Version = {version}")
     return True
 
 
 def normalize_version(version: str) -> str:
     """Normalize version string (remove 'v' prefix if present)."""
-    version = version.strip()
-    if version.startswith('v'):
-        version = version[1:]
-    return version
+    return version.strip().removeprefix('v')
 
 
 def validate_version(version: str) -> bool:
     """Validate version format (semver-like: x.y.z)."""
-    pattern = r'^\d+\.\d+\.\d+(-[a-zA-Z0-9.-]+)?$'
-    return bool(re.match(pattern, version))
+    # Cheap checks first; they also keep non-ASCII digits out of \d
+    return (
+        version.isascii()
+        and version.count('.') >= 2
+        and _SEMVER_RE.match(version) is not None
+    )
 
 
 def main() -> int:
@@ -3,7 +3,8 @@
 Verify embedded PEM certificates in firmware CA bundle.
 
 This script parses `firmware/src/common/ca_certs.h`, extracts all PEM blocks, and
-runs `openssl x509` sanity checks:
+runs sanity checks on each certificate (in-process with the `cryptography`
+package when version 42 or newer is installed, otherwise via `openssl x509`):
 - Expiration relative to 2025-06-23
 - Signature algorithm (flags SHA-1)
 - Public key strength (flags RSA < 2048)
@@ -13,98 +14,222 @@ runs `openssl x509` sanity checks:
 from __future__ import annotations
 
 import datetime as dt
+import os
 import re
 import subprocess
 import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+try:
+    from cryptography import x509
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from cryptography.x509.oid import NameOID, SignatureAlgorithmOID
+except ImportError:
+    x509 = None
+
+# The native parser needs the timezone-aware validity accessors (cryptography >= 42)
+_HAVE_NATIVE = x509 is not None and hasattr(x509.Certificate, "not_valid_after_utc")
+
+# The names `openssl x509 -text` prints, so both parsers report the same text
+_OPENSSL_SIG_NAMES = {
+    SignatureAlgorithmOID.RSA_WITH_MD5: "md5WithRSAEncryption",
+    SignatureAlgorithmOID.RSA_WITH_SHA1: "sha1WithRSAEncryption",
+    SignatureAlgorithmOID.RSA_WITH_SHA224: "sha224WithRSAEncryption",
+    SignatureAlgorithmOID.RSA_WITH_SHA256: "sha256WithRSAEncryption",
+    SignatureAlgorithmOID.RSA_WITH_SHA384: "sha384WithRSAEncryption",
+    SignatureAlgorithmOID.RSA_WITH_SHA512: "sha512WithRSAEncryption",
+    SignatureAlgorithmOID.RSASSA_PSS: "rsassaPss",
+    SignatureAlgorithmOID.ECDSA_WITH_SHA1: "ecdsa-with-SHA1",
+    SignatureAlgorithmOID.ECDSA_WITH_SHA224: "ecdsa-with-SHA224",
+    SignatureAlgorithmOID.ECDSA_WITH_SHA256: "ecdsa-with-SHA256",
+    SignatureAlgorithmOID.ECDSA_WITH_SHA384: "ecdsa-with-SHA384",
+    SignatureAlgorithmOID.ECDSA_WITH_SHA512: "ecdsa-with-SHA512",
+    SignatureAlgorithmOID.DSA_WITH_SHA1: "dsaWithSHA1",
+    SignatureAlgorithmOID.DSA_WITH_SHA224: "dsa_with_SHA224",
+    SignatureAlgorithmOID.DSA_WITH_SHA256: "dsa_with_SHA256",
+    SignatureAlgorithmOID.ED25519: "ED25519",
+    SignatureAlgorithmOID.ED448: "ED448",
+} if _HAVE_NATIVE else {}
+
+_PEM_RE = re.compile(rb"-----BEGIN CERTIFICATE-----.*?-----END CERTIFICATE-----", re.S)
+
+# Fields of `openssl x509 -text` output, in the order openssl prints them
+_OPENSSL_FIELDS_RE = re.compile(
+    r"Signature Algorithm:[ \t]*([^\n]+)\n"
+    r".*?Issuer:[ \t]*([^\n]+)\n"
+    r".*?Not Before:[ \t]*([^\n]+)\n"
+    r".*?Not After :[ \t]*([^\n]+)\n"
+    r".*?Subject:[ \t]*([^\n]+)\n"
+    r"(?:.*?Public-Key: \((\d+) bit\))?",
+    re.S,
+)
+_CN_RE = re.compile(r"CN\s*=\s*([^,\n/]+)")
+
+
+class CertInfo(NamedTuple):
+    """Fields of a certificate that the checks look at."""
+
+    cn: str
+    self_signed: bool
+    not_before: dt.date | None
+    not_after: dt.date | None
+    not_after_text: str
+    sig_alg: str
+    key_bits: int | None
+    is_rsa: bool
+
+
+_MONTHS = {
+    name: number
+    for number, name in enumerate(
+        ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"),
+        start=1,
+    )
+}
 
 
 def _parse_openssl_date(value: str) -> dt.date | None:
+    # openssl prints e.g. "Jun  4 11:04:38 2035 GMT"; only the date is needed
     try:
-        return dt.datetime.strptime(value, "%b %d %H:%M:%S %Y %Z").date()
-    except ValueError:
+        month, day, _time, year = value.split()[:4]
+        return dt.date(int(year), _MONTHS[month], int(day))
+    except (KeyError, ValueError):
         return None
 
 
+def _inspect_cert_native(pem: bytes) -> CertInfo:
+    """Parse a PEM certificate in-process with `cryptography`."""
+    cert = x509.load_pem_x509_certificate(pem)
+    not_after = cert.not_valid_after_utc
+    public_key = cert.public_key()
+    sig_oid = cert.signature_algorithm_oid
+    cn_attrs = cert.subject.get_attributes_for_oid(NameOID.COMMON_NAME)
+    return CertInfo(
+        cn=cn_attrs[0].value.strip() if cn_attrs else "(no CN)",
+        self_signed=cert.subject == cert.issuer,
+        not_before=cert.not_valid_before_utc.date(),
+        not_after=not_after.date(),
+        # Same layout as openssl's text output, e.g. "Jun  4 11:04:38 2035 GMT"
+        not_after_text=f"{not_after:%b} {not_after.day:2d} {not_after:%H:%M:%S %Y} GMT",
+        sig_alg=_OPENSSL_SIG_NAMES.get(sig_oid, sig_oid.dotted_string),
+        key_bits=getattr(public_key, "key_size", None),
+        is_rsa=isinstance(public_key, rsa.RSAPublicKey),
+    )
+
+
+def _inspect_cert_openssl(pem: bytes) -> CertInfo:
+    """Parse a PEM certificate by scraping `openssl x509 -text` output."""
+    proc = subprocess.run(
+        ["openssl", "x509", "-noout", "-text"],
+        input=pem,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=False,
+    )
+    if proc.returncode != 0:
+        raise ValueError(proc.stderr.decode("utf-8", errors="replace").strip())
+
+    text = proc.stdout.decode("utf-8", errors="replace")
+
+    fields = _OPENSSL_FIELDS_RE.search(text)
+    if fields:
+        sig_alg, issuer, not_before, not_after, subject = (
+            value.strip() for value in fields.group(1, 2, 3, 4, 5)
+        )
+        key_bits = fields.group(6)
+    else:
+        sig_alg = issuer = not_before = not_after = subject = ""
+        key_bits = None
+
+    cn_match = _CN_RE.search(subject)
+
+    return CertInfo(
+        cn=cn_match.group(1).strip() if cn_match else "(no CN)",
+        self_signed=bool(subject and issuer and subject == issuer),
+        not_before=_parse_openssl_date(not_before),
+        not_after=_parse_openssl_date(not_after),
+        not_after_text=not_after,
+        sig_alg=sig_alg,
+        key_bits=int(key_bits) if key_bits else None,
+        is_rsa="rsa" in text.lower(),
+    )
+
+
+_inspect_cert = _inspect_cert_native if _HAVE_NATIVE else _inspect_cert_openssl
+
+
+def _inspect_now(pem: bytes) -> Future:
+    """Inspect a certificate in this thread, wrapped like a pool result."""
+    future: Future = Future()
+    try:
+        future.set_result(_inspect_cert(pem))
+    except Exception as exc:
+        future.set_exception(exc)
+    return future
+
+
 def main() -> int:
     ca_path = "firmware/src/common/ca_certs.h"
     try:
-        content = open(ca_path, "r", encoding="utf-8").read()
+        content = Path(ca_path).read_bytes()
     except OSError as exc:
         print(f"ERROR: failed to read {ca_path}: {exc}", file=sys.stderr)
         return 2
 
-    certs = re.findall(
-        r"-----BEGIN CERTIFICATE-----.*?-----END CERTIFICATE-----",
-        content,
-        flags=re.S,
-    )
-    print(f"Found {len(certs)} PEM certificate blocks in {ca_path}")
+    certs = _PEM_RE.findall(content)
+
+    # The report is collected here and written to stdout in one go
+    lines: list[str] = [f"Found {len(certs)} PEM certificate blocks in {ca_path}"]
 
     cutoff = dt.date(2025, 6, 23)
     parsed = 0
     failed = 0
 
-    for idx, pem in enumerate(certs, start=1):
-        proc = subprocess.run(
-            ["openssl", "x509", "-noout", "-text"],
-            input=pem.encode("utf-8"),
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            check=False,
-        )
-        if proc.returncode != 0:
+    if _HAVE_NATIVE:
+        # cryptography holds the GIL while parsing, so a pool would only add
+        # overhead here
+        futures = [_inspect_now(pem) for pem in certs]
+    else:
+        # Each openssl run is a separate process, so run them concurrently
+        # from threads and report the results in file order
+        workers = max(1, min(len(certs), os.cpu_count() or 1))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_inspect_cert, pem) for pem in certs]
+
+    for idx, future in enumerate(futures, start=1):
+        try:
+            info = future.result()
+        except Exception as exc:  # one bad certificate must not abort the report
             failed += 1
-            print(f"[{idx}] PARSE_FAIL: {proc.stderr.decode('utf-8', errors='replace').strip()}")
+            lines.append(f"[{idx}] PARSE_FAIL: {exc}")
             continue
 
         parsed += 1
-        text = proc.stdout.decode("utf-8", errors="replace")
-
-        def grab(prefix: str) -> str:
-            match = re.search(prefix + r"\s*([^\n]+)", text)
-            return match.group(1).strip() if match else ""
-
-        subject = grab("Subject:")
-        issuer = grab("Issuer:")
-        not_before = grab("Not Before:")
-        not_after = grab("Not After :")
-        sig_alg = grab("Signature Algorithm:")
-
-        key_bits_match = (
-            re.search(r"(?:RSA )?Public-Key: \((\d+) bit\)", text)
-            or re.search(r"RSA Public-Key: \((\d+) bit\)", text)
-        )
-        key_bits = int(key_bits_match.group(1)) if key_bits_match else None
-
-        not_after_date = _parse_openssl_date(not_after)
-        not_before_date = _parse_openssl_date(not_before)
 
         issues: list[str] = []
-        if not_after_date and not_after_date < cutoff:
-            issues.append(f"CRITICAL expired {not_after_date.isoformat()}")
-        if not_before_date and not_before_date > cutoff:
-            issues.append(f"WARN notYetValid {not_before_date.isoformat()}")
-        if "sha1" in sig_alg.lower():
-            issues.append(f"WARN insecureSig {sig_alg}")
+        if info.not_after and info.not_after < cutoff:
+            issues.append(f"CRITICAL expired {info.not_after.isoformat()}")
+        if info.not_before and info.not_before > cutoff:
+            issues.append(f"WARN notYetValid {info.not_before.isoformat()}")
+        if "sha1" in info.sig_alg.lower():
+            issues.append(f"WARN insecureSig {info.sig_alg}")
 
-        if key_bits is not None and key_bits < 2048 and "rsa" in text.lower():
-            issues.append(f"WARN weakKey RSA {key_bits}")
+        if info.key_bits is not None and info.key_bits < 2048 and info.is_rsa:
+            issues.append(f"WARN weakKey RSA {info.key_bits}")
 
-        if subject and issuer and subject == issuer:
+        if info.self_signed:
             issues.append("INFO selfSigned")
 
-        cn_match = re.search(r"CN\s*=\s*([^,\n/]+)", subject)
-        cn = cn_match.group(1).strip() if cn_match else "(no CN)"
-
+        summary = f"[{idx}] CN={info.cn} notAfter={info.not_after_text} keyBits={info.key_bits} sig={info.sig_alg}"
         if issues:
-            print(
-                f"[{idx}] CN={cn} notAfter={not_after} keyBits={key_bits} sig={sig_alg} | "
-                + " | ".join(issues)
-            )
+            lines.append(f"{summary} | " + " | ".join(issues))
         else:
-            print(f"[{idx}] CN={cn} notAfter={not_after} keyBits={key_bits} sig={sig_alg} PASS")
+            lines.append(f"{summary} PASS")
 
-    print(f"Parsed: {parsed}, failed: {failed}")
+    lines.append(f"Parsed: {parsed}, failed: {failed}")
+    sys.stdout.write("\n".join(lines) + "\n")
     return 0 if failed == 0 else 1
 
 
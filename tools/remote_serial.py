@@ -30,15 +30,18 @@ Example:
 
 import argparse
 import asyncio
-import base64
+import binascii
+import enum
+import functools
 import json
 import logging
 import os
+import queue
 import signal
 import socket
 import sys
-import threading
 import time
+import uuid
 from typing import Optional, Dict, Any
 from urllib.parse import urlparse
 
@@ -51,12 +54,17 @@ except ImportError as e:
     print("Install with: pip install pyserial websockets")
     sys.exit(1)
 
+# Optional: faster JSON encoding/decoding for Phoenix frames
 try:
-    import aiohttp
+    import orjson
 except ImportError:
-    print("Error: Missing required package: aiohttp")
-    print("Install with: pip install aiohttp")
-    sys.exit(1)
+    orjson = None
+
+# Optional: SIMD base64 for serial payloads
+try:
+    import pybase64
+except ImportError:
+    pybase64 = None
 
 
 # =============================================================================
@@ -64,16 +72,35 @@ except ImportError:
 # =============================================================================
 
 MAX_BROADCAST_SIZE = 200 * 1024  # 200KB max per broadcast message
+SERIAL_CHUNK_SIZE = (MAX_BROADCAST_SIZE // 2) // 4 * 3  # raw bytes per serial_input chunk
 HEARTBEAT_INTERVAL = 30  # seconds
 RECONNECT_DELAY = 5  # seconds
+SERIAL_COALESCE_DELAY = 0.002  # seconds to gather serial output into one broadcast
+RX_BUFFER_SIZE = 64 * 1024  # initial virtual RX ring size (grows on demand)
+SEND_QUEUE_SIZE = 64  # outbound WebSocket messages queued before senders wait
+RECV_BUFSIZE = 64 * 1024  # bytes read from the RFC 2217 client per recv
+CLIENT_SOCKET_BUFSIZE = 256 * 1024  # kernel send/receive buffers for the RFC 2217 client
+
+# Telnet IAC byte; it is sent doubled when it appears in serial data
+IAC = serial.rfc2217.IAC
+IAC_ESCAPED = IAC + IAC
 
 
 # =============================================================================
 # Environment Variable Loading
 # =============================================================================
 
+# .env lives in the workspace root (parent of tools/)
+_WORKSPACE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_ENV_PATH = os.path.join(_WORKSPACE_ROOT, ".env")
+
+
+@functools.lru_cache(maxsize=8)
 def load_env_file(env_path: str = ".env") -> Dict[str, str]:
-    """Load environment variables from .env file (simple parser, no python-dotenv required)."""
+    """Load environment variables from .env file (simple parser, no python-dotenv required).
+
+    The result is cached per path, so callers must treat it as read-only.
+    """
     env_vars = {}
     if not os.path.exists(env_path):
         return env_vars
@@ -94,15 +121,38 @@ def load_env_file(env_path: str = ".env") -> Dict[str, str]:
 
 def get_env_var(key: str, default: Optional[str] = None) -> Optional[str]:
     """Get environment variable, checking .env file first."""
-    # Load .env from workspace root
-    workspace_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    env_path = os.path.join(workspace_root, ".env")
-    env_vars = load_env_file(env_path)
+    env_vars = load_env_file(_ENV_PATH)
     
     # Check environment first, then .env file
     return os.environ.get(key) or env_vars.get(key, default)
 
 
+# =============================================================================
+# Encoding Helpers
+# =============================================================================
+
+if orjson is not None:
+    def _json_dumps(obj: Any) -> str:
+        # Realtime expects text frames, so hand websockets a str, not bytes
+        return orjson.dumps(obj).decode("utf-8")
+
+    _json_loads = orjson.loads
+else:
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
+if pybase64 is not None:
+    _b64encode = pybase64.b64encode_as_string
+
+    def _b64decode(data: str) -> bytes:
+        return pybase64.b64decode(data, validate=False)
+else:
+    def _b64encode(data: bytes) -> str:
+        return binascii.b2a_base64(data, newline=False).decode("ascii")
+
+    _b64decode = binascii.a2b_base64
+
+
 # =============================================================================
 # Virtual Serial Port (for RFC 2217 PortManager)
 # =============================================================================
@@ -126,17 +176,37 @@ class VirtualSerialPort:
         self._dtr = False
         self._rts = False
         self._baudrate = 115200
-        self._rx_buffer = bytearray()
-        self._rx_lock = threading.Lock()
+        
+        # Producers hand chunks over through _rx_queue; only the reading side
+        # touches the RX ring (_rx_count unread bytes starting at _rx_head)
+        self._rx_queue: "queue.SimpleQueue[bytes]" = queue.SimpleQueue()
+        self._rx_ring = bytearray(RX_BUFFER_SIZE)
+        self._rx_view = memoryview(self._rx_ring)
+        self._rx_head = 0
+        self._rx_count = 0
+        
+        # Set when feed_data() delivers bytes, so readers can wait instead of poll
+        self._data_event = asyncio.Event()
         
     def read(self, size: int = 1) -> bytes:
         """Read data from the virtual RX buffer."""
-        with self._rx_lock:
-            if len(self._rx_buffer) == 0:
-                return b""
-            data = bytes(self._rx_buffer[:size])
-            self._rx_buffer = self._rx_buffer[size:]
-            return data
+        self._drain_rx_queue()
+        size = min(size, self._rx_count)
+        if size <= 0:
+            return b""
+        
+        capacity = len(self._rx_ring)
+        head = self._rx_head
+        end = head + size
+        if end <= capacity:
+            data = self._rx_view[head:end].tobytes()
+        else:
+            # Wraps around the end of the ring
+            data = self._rx_view[head:].tobytes() + self._rx_view[:end - capacity].tobytes()
+        
+        self._rx_count -= size
+        self._rx_head = end % capacity if self._rx_count else 0
+        return data
     
     def write(self, data: bytes) -> int:
         """Write data (relays to WebSocket via callback)."""
@@ -146,8 +216,55 @@ class VirtualSerialPort:
     
     def feed_data(self, data: bytes):
         """Feed received data into the RX buffer (called by WebSocket handler)."""
-        with self._rx_lock:
-            self._rx_buffer.extend(data)
+        if data:
+            self._rx_queue.put(bytes(data))
+            self._data_event.set()
+    
+    async def wait_for_data(self):
+        """Wait until there is unread data in the RX buffer."""
+        while not self.in_waiting:
+            self._data_event.clear()
+            await self._data_event.wait()
+    
+    def _drain_rx_queue(self):
+        """Move chunks handed over by feed_data() into the RX ring."""
+        while True:
+            try:
+                data = self._rx_queue.get_nowait()
+            except queue.Empty:
+                return
+            
+            size = len(data)
+            if self._rx_count + size > len(self._rx_ring):
+                self._grow_rx_ring(self._rx_count + size)
+            
+            capacity = len(self._rx_ring)
+            tail = (self._rx_head + self._rx_count) % capacity
+            first = min(size, capacity - tail)
+            src = memoryview(data)
+            self._rx_view[tail:tail + first] = src[:first]
+            if first < size:
+                # Wrap the remainder to the start of the ring
+                self._rx_view[:size - first] = src[first:]
+            self._rx_count += size
+    
+    def _grow_rx_ring(self, needed: int):
+        """Reallocate the RX ring to hold at least `needed` bytes."""
+        capacity = len(self._rx_ring)
+        while capacity < needed:
+            capacity *= 2
+        
+        # Copy unread bytes to the start of the new ring, unwrapping them
+        ring = bytearray(capacity)
+        head = self._rx_head
+        pending = self._rx_count
+        first = min(pending, len(self._rx_ring) - head)
+        ring[:first] = self._rx_view[head:head + first]
+        ring[first:pending] = self._rx_view[:pending - first]
+        
+        self._rx_ring = ring
+        self._rx_view = memoryview(ring)
+        self._rx_head = 0
     
     @property
     def dtr(self) -> bool:
@@ -182,8 +299,8 @@ class VirtualSerialPort:
     @property
     def in_waiting(self) -> int:
         """Return number of bytes available in RX buffer."""
-        with self._rx_lock:
-            return len(self._rx_buffer)
+        self._drain_rx_queue()
+        return self._rx_count
     
     def get_settings(self):
         """Return current settings dict (for compatibility with real serial ports)."""
@@ -210,6 +327,9 @@ class VirtualSerialPort:
 class PhoenixClient:
     """Phoenix Channels WebSocket client for Supabase Realtime."""
     
+    # Heartbeats only differ in their ref, so they are formatted from a fixed frame
+    HEARTBEAT_TEMPLATE = '{"topic":"phoenix","event":"heartbeat","payload":{},"ref":"%d"}'
+    
     def __init__(self, supabase_url: str, anon_key: str, access_token: str, channel_topic: str):
         self.supabase_url = supabase_url.rstrip("/")
         self.anon_key = anon_key
@@ -229,6 +349,11 @@ class PhoenixClient:
         self.msg_ref = 0
         self.join_ref = 0
         
+        # Outbound (is_broadcast, message) pairs, written to the socket by a
+        # single sender task
+        self._send_queue: asyncio.Queue = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+        self._sender_task: Optional[asyncio.Task] = None
+        
         # Event handlers
         self.on_broadcast: Optional[callable] = None
         
@@ -254,7 +379,7 @@ class PhoenixClient:
             if self.join_ref > 0:
                 msg["join_ref"] = str(self.join_ref)
         
-        return json.dumps(msg)
+        return _json_dumps(msg)
     
     async def connect(self):
         """Connect to Supabase Realtime WebSocket."""
@@ -266,8 +391,16 @@ class PhoenixClient:
             self.connected = True
             logging.info("WebSocket connected")
             
-            # Start receive loop
+            # Frames queued for a previous connection are stale: the new
+            # socket has to join the channel before it may broadcast
+            while not self._send_queue.empty():
+                self._send_queue.get_nowait()
+            
+            # Start receive loop and the sender for this connection
             asyncio.create_task(self._receive_loop())
+            if self._sender_task:
+                self._sender_task.cancel()
+            self._sender_task = asyncio.create_task(self._sender_loop())
             
             # Join channel
             await self.join_channel()
@@ -291,7 +424,7 @@ class PhoenixClient:
         }
         
         message = self.build_message(self.channel_topic, "phx_join", payload, self.join_ref)
-        await self.ws.send(message)
+        await self._send_queue.put((False, message))
         logging.info(f"Sent phx_join to {self.channel_topic}")
     
     async def send_broadcast(self, event: str, payload: Dict[str, Any]):
@@ -306,22 +439,41 @@ class PhoenixClient:
         }
         
         message = self.build_message(self.channel_topic, "broadcast", broadcast_payload)
-        await self.ws.send(message)
+        await self._send_queue.put((True, message))
     
     async def send_heartbeat(self):
         """Send heartbeat message."""
         if not self.connected:
             return
         
-        message = self.build_message("phoenix", "heartbeat", {})
-        await self.ws.send(message)
+        self.msg_ref += 1
+        await self._send_queue.put((False, self.HEARTBEAT_TEMPLATE % self.msg_ref))
+    
+    async def _sender_loop(self):
+        """Write queued messages to the WebSocket, one frame per message."""
+        while True:
+            is_broadcast, message = await self._send_queue.get()
+            if is_broadcast and not self.subscribed:
+                # Queued before a disconnect; Realtime rejects broadcasts
+                # until the new join is acknowledged
+                logging.debug("Dropping broadcast queued before reconnect")
+                continue
+            try:
+                await self.ws.send(message)
+            except websockets.exceptions.ConnectionClosed:
+                # The receive loop sees the close and reconnects, which starts
+                # a new sender
+                logging.warning("WebSocket closed while sending")
+                return
+            except Exception as e:
+                logging.error(f"Failed to send message: {e}")
     
     async def _receive_loop(self):
         """Receive and handle WebSocket messages."""
         try:
             async for message in self.ws:
                 try:
-                    data = json.loads(message)
+                    data = _json_loads(message)
                     await self._handle_message(data)
                 except json.JSONDecodeError as e:
                     logging.error(f"Failed to parse message: {e}")
@@ -385,6 +537,8 @@ class PhoenixClient:
     async def close(self):
         """Close WebSocket connection."""
         self._should_reconnect = False
+        if self._sender_task:
+            self._sender_task.cancel()
         if self.ws:
             await self.ws.close()
         self.connected = False
@@ -395,6 +549,14 @@ class PhoenixClient:
 # RFC 2217 Server with WebSocket Relay
 # =============================================================================
 
+class OutKind(enum.Enum):
+    """Outgoing broadcast kinds queued for the bridge's flush loop (value is the event name)."""
+    DATA = "serial_input"
+    SIGNAL = "signal"
+    BAUD = "set_baud"
+    COMMAND = "command"
+
+
 class RemoteSerialBridge:
     """RFC 2217 server that relays serial data through Supabase Realtime."""
     
@@ -415,6 +577,13 @@ class RemoteSerialBridge:
         self.client_socket: Optional[socket.socket] = None
         self.alive = False
         self.shutdown_event: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # Serializes sends to the TCP client so concurrent writes never interleave
+        self._client_send_lock = asyncio.Lock()
+        
+        # PortManager responses for the current client, sent in order by _control_loop
+        self._control_queue: asyncio.Queue = asyncio.Queue()
         
         # Setup broadcast handler
         self.phoenix_client.on_broadcast = self._on_broadcast
@@ -423,15 +592,20 @@ class RemoteSerialBridge:
         self.device_uuid: Optional[str] = None
         self.user_uuid: Optional[str] = None
         
+        # (OutKind, payload) broadcasts waiting to be sent, drained in order by _flush_loop
+        self._tx_queue: asyncio.Queue = asyncio.Queue()
+        
     async def start(self, shutdown_event: Optional[asyncio.Event] = None):
         """Start the RFC 2217 server and WebSocket client."""
         self.shutdown_event = shutdown_event
+        self._loop = asyncio.get_running_loop()
         
         # Connect WebSocket
         await self.phoenix_client.connect()
         
-        # Start heartbeat task
+        # Start heartbeat and outgoing broadcast tasks
         asyncio.create_task(self._heartbeat_loop())
+        asyncio.create_task(self._flush_loop())
         
         # Start RFC 2217 server
         await self._start_rfc2217_server()
@@ -446,6 +620,9 @@ class RemoteSerialBridge:
         """Start the RFC 2217 TCP server."""
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        # Set before listen() so accepted sockets inherit it and the window
+        # scale negotiated in the handshake can use the larger buffer
+        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, CLIENT_SOCKET_BUFSIZE)
         self.server_socket.bind(("localhost", self.port))
         self.server_socket.listen(1)
         self.server_socket.setblocking(False)
@@ -454,36 +631,41 @@ class RemoteSerialBridge:
         print(f"\n✓ RFC 2217 server ready at: rfc2217://localhost:{self.port}")
         print("  Connect PlatformIO with: pio device monitor --port rfc2217://localhost:{}\n".format(self.port))
         
-        # Accept connections in event loop
-        loop = asyncio.get_event_loop()
-        while True:
-            try:
-                # Check for shutdown
-                if self.shutdown_event and self.shutdown_event.is_set():
-                    break
-                
-                # Use asyncio.wait_for to allow cancellation
+        # Accept connections in event loop, racing each accept against shutdown
+        stop_task = asyncio.create_task(self.shutdown_event.wait()) if self.shutdown_event else None
+        try:
+            while True:
+                accept_task = asyncio.ensure_future(self._loop.sock_accept(self.server_socket))
                 try:
-                    client_socket, addr = await asyncio.wait_for(
-                        loop.sock_accept(self.server_socket),
-                        timeout=1.0
-                    )
+                    waiters = {accept_task, stop_task} if stop_task else {accept_task}
+                    done, _ = await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+                    if accept_task not in done:
+                        # Shutdown requested
+                        accept_task.cancel()
+                        break
+                    
+                    client_socket, addr = accept_task.result()
                     logging.info(f"Client connected from {addr[0]}:{addr[1]}")
                     await self._handle_client(client_socket)
-                except asyncio.TimeoutError:
-                    # Timeout is expected - check shutdown and continue
-                    continue
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                if self.shutdown_event and self.shutdown_event.is_set():
+                except asyncio.CancelledError:
+                    accept_task.cancel()
                     break
-                logging.error(f"Error accepting client: {e}")
+                except Exception as e:
+                    if self.shutdown_event and self.shutdown_event.is_set():
+                        break
+                    logging.error(f"Error accepting client: {e}")
+        finally:
+            if stop_task:
+                stop_task.cancel()
     
     async def _handle_client(self, client_socket: socket.socket):
         """Handle a single RFC 2217 client connection."""
         self.client_socket = client_socket
         self.client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, CLIENT_SOCKET_BUFSIZE)
+        
+        # Fresh queue so responses meant for a previous client are never sent
+        self._control_queue = asyncio.Queue()
         
         # Initialize RFC 2217 PortManager
         # PortManager expects (serial_instance, redirector, logger=None)
@@ -505,19 +687,21 @@ class RemoteSerialBridge:
         
         self.alive = True
         
-        # Start reader task (serial -> socket)
+        # Start reader task (serial -> socket) and PortManager response sender
         reader_task = asyncio.create_task(self._reader_loop())
+        control_task = asyncio.create_task(self._control_loop())
         
         # Start writer loop (socket -> serial)
         try:
             await self._writer_loop()
         finally:
             self.alive = False
-            reader_task.cancel()
-            try:
-                await reader_task
-            except asyncio.CancelledError:
-                pass
+            for task in (reader_task, control_task):
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
             
             self.client_socket.close()
             self.client_socket = None
@@ -532,27 +716,35 @@ class RemoteSerialBridge:
         """Read from virtual port and send to RFC 2217 client."""
         while self.alive:
             try:
-                data = self.virtual_port.read(self.virtual_port.in_waiting or 1)
+                await self.virtual_port.wait_for_data()
+                data = self.virtual_port.read(self.virtual_port.in_waiting)
                 if data and self.client_socket and self.rfc2217:
-                    # Escape IAC characters for Telnet
-                    escaped = b"".join(self.rfc2217.escape(data))
-                    self.client_socket.sendall(escaped)
-                await asyncio.sleep(0.01)  # Small delay to prevent busy loop
+                    # Escape IAC characters for Telnet by doubling them; same
+                    # result as PortManager.escape() without a per-byte generator
+                    escaped = data.replace(IAC, IAC_ESCAPED)
+                    await self._send_to_client(escaped)
             except Exception as e:
                 logging.error(f"Reader loop error: {e}")
                 break
     
     async def _writer_loop(self):
         """Read from RFC 2217 client and write to virtual port."""
-        loop = asyncio.get_event_loop()
+        # Receive into one reusable buffer instead of a new bytes per call
+        recv_buf = bytearray(RECV_BUFSIZE)
+        recv_view = memoryview(recv_buf)
+        # Linux clears TCP_QUICKACK again on its own, so it is re-armed after
+        # every read to keep ACKs for the client's writes immediate
+        quickack = getattr(socket, "TCP_QUICKACK", None)
         while self.alive:
             try:
-                data = await loop.sock_recv(self.client_socket, 1024)
-                if not data:
+                size = await self._loop.sock_recv_into(self.client_socket, recv_buf)
+                if not size:
                     break
+                if quickack is not None:
+                    self.client_socket.setsockopt(socket.IPPROTO_TCP, quickack, 1)
                 # Filter RFC 2217 commands
                 if self.rfc2217:
-                    filtered = b"".join(self.rfc2217.filter(data))
+                    filtered = b"".join(self.rfc2217.filter(recv_view[:size]))
                     if filtered:
                         self.virtual_port.write(filtered)
             except Exception as e:
@@ -565,63 +757,106 @@ class RemoteSerialBridge:
             return
         
         if self.mode == "connect":
-            # Base64 encode for transmission
-            data_b64 = base64.b64encode(data).decode("utf-8")
-            
-            # Chunk if necessary
-            chunk_size = MAX_BROADCAST_SIZE // 2  # Conservative chunk size
-            if len(data_b64) > chunk_size:
-                # Split into chunks
-                for i in range(0, len(data_b64), chunk_size):
-                    chunk = data_b64[i:i + chunk_size]
-                    asyncio.create_task(self.phoenix_client.send_broadcast(
-                        "serial_input",
-                        {"data": chunk, "binary": True, "chunk": i // chunk_size}
-                    ))
-            else:
-                asyncio.create_task(self.phoenix_client.send_broadcast(
-                    "serial_input",
-                    {"data": data_b64, "binary": True}
-                ))
+            # Coalesced with writes that arrive close together by _flush_loop
+            self._tx_queue.put_nowait((OutKind.DATA, data))
         
         elif self.mode == "direct":
             # Parse text lines as commands
             try:
-                text = data.decode("utf-8", errors="ignore").strip()
-                if not text:
+                # Split on the raw bytes; only the command name gets decoded
+                # and the JSON tail goes to the parser as bytes
+                line = data.strip()
+                if not line:
                     return
                 
                 # Try to parse as "command_name {json_params}"
                 # Example: "set_brightness {\"level\": 50}"
-                parts = text.split(None, 1)
-                if len(parts) == 1:
-                    # Just command name, no params
-                    command_name = parts[0]
-                    params = {}
+                idx = line.find(b" ")
+                if idx == -1:
+                    name, tail = line, None
                 else:
-                    command_name = parts[0]
+                    name, tail = line[:idx], line[idx + 1:].lstrip()
+                command_name = name.decode("utf-8", errors="ignore")
+                params = {}
+                if tail:
                     try:
-                        params = json.loads(parts[1])
-                    except json.JSONDecodeError:
-                        # If JSON parsing fails, treat entire line as command name
-                        command_name = text
-                        params = {}
+                        params = _json_loads(tail)
+                    except ValueError:
+                        # If JSON parsing (or decoding) fails, treat entire line as command name
+                        command_name = line.decode("utf-8", errors="ignore")
                 
                 # Send command broadcast
                 if self.device_uuid:
-                    asyncio.create_task(self.phoenix_client.send_broadcast(
-                        "command",
-                        {
-                            "device_uuid": self.device_uuid,
-                            "command": {
-                                "type": command_name,
-                                "params": params
-                            }
+                    self._tx_queue.put_nowait((OutKind.COMMAND, {
+                        "device_uuid": self.device_uuid,
+                        "command": {
+                            "type": command_name,
+                            "params": params
                         }
-                    ))
+                    }))
             except Exception as e:
                 logging.error(f"Failed to parse command: {e}")
     
+    async def _flush_loop(self):
+        """Send queued broadcasts in order, coalescing serial data that arrives close together."""
+        while True:
+            items = [await self._tx_queue.get()]
+            
+            # Large writes go out immediately; small ones wait briefly for more data
+            kind, payload = items[0]
+            if kind is OutKind.DATA and len(payload) < SERIAL_CHUNK_SIZE:
+                await asyncio.sleep(SERIAL_COALESCE_DELAY)
+            while not self._tx_queue.empty():
+                items.append(self._tx_queue.get_nowait())
+            
+            # Merge runs of serial data; other broadcasts keep their place
+            data = None
+            for kind, payload in items:
+                if kind is OutKind.DATA:
+                    if data is None:
+                        data = bytearray(payload)
+                    else:
+                        data += payload
+                    continue
+                if data is not None:
+                    await self._send_queued(OutKind.DATA, data)
+                    data = None
+                await self._send_queued(kind, payload)
+            if data is not None:
+                await self._send_queued(OutKind.DATA, data)
+    
+    async def _send_queued(self, kind: OutKind, payload: Any):
+        """Send one broadcast taken from the outgoing queue."""
+        try:
+            if kind is OutKind.DATA:
+                await self._send_serial_input(payload)
+            else:
+                await self.phoenix_client.send_broadcast(kind.value, payload)
+        except Exception as e:
+            logging.error(f"Failed to send {kind.value}: {e}")
+    
+    async def _send_serial_input(self, data: bytearray):
+        """Broadcast serial data as one or more serial_input events."""
+        # Chunk if necessary, encoding each raw chunk on its own so the full
+        # base64 string is never built, and sending in order. Chunks are a
+        # multiple of 3 bytes, so each encodes to a standalone base64 string.
+        if len(data) > SERIAL_CHUNK_SIZE:
+            view = memoryview(data)
+            for i in range(0, len(data), SERIAL_CHUNK_SIZE):
+                await self.phoenix_client.send_broadcast(
+                    "serial_input",
+                    {
+                        "data": _b64encode(view[i:i + SERIAL_CHUNK_SIZE]),
+                        "binary": True,
+                        "chunk": i // SERIAL_CHUNK_SIZE,
+                    }
+                )
+        else:
+            await self.phoenix_client.send_broadcast(
+                "serial_input",
+                {"data": _b64encode(data), "binary": True}
+            )
+    
     def _on_signal_change(self, dtr: bool, rts: bool):
         """Handle DTR/RTS signal changes."""
         if not self.phoenix_client.subscribed:
@@ -629,10 +864,7 @@ class RemoteSerialBridge:
         
         if self.mode == "connect":
             # Relay to support session
-            asyncio.create_task(self.phoenix_client.send_broadcast(
-                "signal",
-                {"dtr": dtr, "rts": rts}
-            ))
+            self._tx_queue.put_nowait((OutKind.SIGNAL, {"dtr": dtr, "rts": rts}))
         elif self.mode == "direct":
             # Check for reset sequence: DTR false, RTS true then DTR false, RTS false
             # This is a common reset pattern
@@ -643,16 +875,13 @@ class RemoteSerialBridge:
                 # Could be reset completion
                 # Send reboot command
                 if self.device_uuid:
-                    asyncio.create_task(self.phoenix_client.send_broadcast(
-                        "command",
-                        {
-                            "device_uuid": self.device_uuid,
-                            "command": {
-                                "type": "reboot",
-                                "params": {}
-                            }
+                    self._tx_queue.put_nowait((OutKind.COMMAND, {
+                        "device_uuid": self.device_uuid,
+                        "command": {
+                            "type": "reboot",
+                            "params": {}
                         }
-                    ))
+                    }))
     
     def _on_baud_change(self, baudrate: int):
         """Handle baud rate changes."""
@@ -661,10 +890,7 @@ class RemoteSerialBridge:
         
         if self.mode == "connect":
             # Relay to support session
-            asyncio.create_task(self.phoenix_client.send_broadcast(
-                "set_baud",
-                {"rate": baudrate}
-            ))
+            self._tx_queue.put_nowait((OutKind.BAUD, {"rate": baudrate}))
         # Direct mode: acknowledge locally (no device involvement needed)
     
     def _on_broadcast(self, event: str, payload: Dict[str, Any]):
@@ -675,7 +901,7 @@ class RemoteSerialBridge:
                 data_b64 = payload.get("data", "")
                 if data_b64:
                     try:
-                        data = base64.b64decode(data_b64)
+                        data = _b64decode(data_b64)
                         self.virtual_port.feed_data(data)
                     except Exception as e:
                         logging.error(f"Failed to decode serial_output: {e}")
@@ -688,80 +914,111 @@ class RemoteSerialBridge:
         elif self.mode == "direct":
             if event == "debug_log":
                 # Format debug log as serial output
-                level = payload.get("level", "info")
-                message = payload.get("message", "")
+                level = str(payload.get("level", "info")).upper().encode("utf-8")
+                message = str(payload.get("message", "")).encode("utf-8")
                 tag = payload.get("metadata", {}).get("tag", "")
                 
-                # Format: [LEVEL] [tag] message\r\n
-                formatted = f"[{level.upper()}]"
+                # Format: [LEVEL] [tag] message\r\n, built directly as bytes
                 if tag:
-                    formatted += f" [{tag}]"
-                formatted += f" {message}\r\n"
+                    formatted = b"[%s] [%s] %s\r\n" % (level, str(tag).encode("utf-8"), message)
+                else:
+                    formatted = b"[%s] %s\r\n" % (level, message)
                 
-                self.virtual_port.feed_data(formatted.encode("utf-8"))
+                self.virtual_port.feed_data(formatted)
             
             elif event == "command":
                 # Command acknowledgment (ignore for now)
                 pass
     
-    def write(self, data: bytes):
-        """Write to TCP client socket (called by PortManager for RFC 2217 negotiation responses)."""
-        if self.client_socket:
+    async def _send_to_client(self, data: bytes):
+        """Send data to the TCP client without blocking the event loop."""
+        async with self._client_send_lock:
+            if self.client_socket:
+                await self._loop.sock_sendall(self.client_socket, data)
+    
+    async def _control_loop(self):
+        """Send queued PortManager responses to the TCP client in order."""
+        while True:
+            data = await self._control_queue.get()
             try:
-                self.client_socket.sendall(data)
+                await self._send_to_client(data)
             except Exception as e:
                 logging.error(f"Failed to write to TCP client: {e}")
+    
+    def write(self, data: bytes):
+        """Write to TCP client socket (called by PortManager for RFC 2217 negotiation responses)."""
+        if self.client_socket:
+            # PortManager calls this synchronously; _control_loop does the send
+            self._control_queue.put_nowait(data)
 
 
 # =============================================================================
 # Authentication
 # =============================================================================
 
-async def authenticate(supabase_url: str, email: str, password: str) -> str:
+def create_http_session():
+    """Create the HTTP session shared by the startup requests (login, device lookup).
+    
+    aiohttp is imported here, on first use, since --token in connect mode needs no HTTP.
+    """
+    try:
+        import aiohttp
+    except ImportError:
+        print("Error: Missing required package: aiohttp")
+        print("Install with: pip install aiohttp")
+        sys.exit(1)
+    return aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=4, ttl_dns_cache=300))
+
+
+async def authenticate(session, supabase_url: str, email: str, password: str) -> str:
     """Authenticate with Supabase and get access token."""
     auth_url = f"{supabase_url.rstrip('/')}/auth/v1/token?grant_type=password"
     
-    async with aiohttp.ClientSession() as session:
-        async with session.post(
-            auth_url,
-            json={"email": email, "password": password},
-            headers={"Content-Type": "application/json"},
-        ) as resp:
-            if resp.status != 200:
-                error_text = await resp.text()
-                raise Exception(f"Authentication failed: HTTP {resp.status} - {error_text}")
-            
-            data = await resp.json()
-            return data["access_token"]
+    async with session.post(
+        auth_url,
+        json={"email": email, "password": password},
+        headers={"Content-Type": "application/json"},
+    ) as resp:
+        if resp.status != 200:
+            error_text = await resp.text()
+            raise Exception(f"Authentication failed: HTTP {resp.status} - {error_text}")
+        
+        data = await resp.json()
+        return data["access_token"]
 
 
-async def get_device_user_uuid(supabase_url: str, anon_key: str, device_identifier: str):
+async def get_device_user_uuid(session, supabase_url: str, anon_key: str, device_identifier: str):
     """Get user_uuid for a device by UUID or serial number."""
     # Try to query devices table
     query_url = f"{supabase_url.rstrip('/')}/rest/v1/display.devices"
     
-    async with aiohttp.ClientSession() as session:
-        # Try as UUID first
-        async with session.get(
-            query_url,
-            params={"uuid": f"eq.{device_identifier}", "select": "uuid,user_id"},
-            headers={"apikey": anon_key, "Authorization": f"Bearer {anon_key}"},
-        ) as resp:
-            if resp.status == 200:
-                data = await resp.json()
-                if data and len(data) > 0:
-                    return data[0]["uuid"], data[0]["user_id"]
-        
-        # Try as serial number
-        async with session.get(
-            query_url,
-            params={"serial_number": f"eq.{device_identifier}", "select": "uuid,user_id"},
-            headers={"apikey": anon_key, "Authorization": f"Bearer {anon_key}"},
-        ) as resp:
-            if resp.status == 200:
-                data = await resp.json()
-                if data and len(data) > 0:
-                    return data[0]["uuid"], data[0]["user_id"]
+    # Match UUID or serial number in one request. The uuid filter is only
+    # added for identifiers that are UUIDs, since anything else would make
+    # the whole query fail on the uuid column.
+    params = {"select": "uuid,user_id"}
+    try:
+        # Canonical form, since braced, urn:uuid: and hyphenless input parse too
+        device_uuid = str(uuid.UUID(device_identifier))
+    except ValueError:
+        device_uuid = None
+        params["serial_number"] = f"eq.{device_identifier}"
+    else:
+        # Quote the raw serial number so characters like ',' ':' or '{' in it
+        # cannot break the filter syntax
+        serial = device_identifier.replace("\\", "\\\\").replace('"', '\\"')
+        params["or"] = f'(uuid.eq.{device_uuid},serial_number.eq."{serial}")'
+    
+    async with session.get(
+        query_url,
+        params=params,
+        headers={"apikey": anon_key, "Authorization": f"Bearer {anon_key}"},
+    ) as resp:
+        if resp.status == 200:
+            data = await resp.json()
+            if data:
+                # Prefer a UUID match over a serial number match
+                row = next((row for row in data if str(row.get("uuid", "")).lower() == device_uuid), data[0])
+                return row["uuid"], row["user_id"]
     
     raise Exception(f"Device not found: {device_identifier}")
 
@@ -780,55 +1037,65 @@ async def main_async(args):
         logging.error("Missing SUPABASE_URL and/or SUPABASE_ANON_KEY")
         sys.exit(1)
     
-    # Get access token
-    if args.token:
-        access_token = args.token
-    else:
-        email = get_env_var("SUPABASE_ADMIN_EMAIL") or args.email
-        password = get_env_var("SUPABASE_ADMIN_PASSWORD") or args.password
-        
-        if not email or not password:
-            logging.error("Missing SUPABASE_ADMIN_EMAIL and/or SUPABASE_ADMIN_PASSWORD (or use --token)")
-            sys.exit(1)
-        
-        logging.info("Authenticating...")
-        access_token = await authenticate(supabase_url, email, password)
-        logging.info("Authentication successful")
+    # One HTTP session (connection pool) for the startup requests, if any
+    http_session = None
+    if not args.token or args.mode == "direct":
+        http_session = create_http_session()
     
-    # Determine channel and mode
-    if args.mode == "connect":
-        session_id = args.session
-        if not session_id:
-            logging.error("Missing --session for connect mode")
-            sys.exit(1)
-        
-        channel_topic = f"realtime:support:{session_id}"
+    try:
+        # Get access token
+        if args.token:
+            access_token = args.token
+        else:
+            email = get_env_var("SUPABASE_ADMIN_EMAIL") or args.email
+            password = get_env_var("SUPABASE_ADMIN_PASSWORD") or args.password
+            
+            if not email or not password:
+                logging.error("Missing SUPABASE_ADMIN_EMAIL and/or SUPABASE_ADMIN_PASSWORD (or use --token)")
+                sys.exit(1)
+            
+            logging.info("Authenticating...")
+            access_token = await authenticate(http_session, supabase_url, email, password)
+            logging.info("Authentication successful")
         
-        # Create Phoenix client first
-        phoenix_client = PhoenixClient(supabase_url, anon_key, access_token, channel_topic)
-        bridge = RemoteSerialBridge(args.port, phoenix_client, "connect", session_id)
-    
-    elif args.mode == "direct":
-        device_identifier = args.device
-        if not device_identifier:
-            logging.error("Missing --device for direct mode")
-            sys.exit(1)
+        # Determine channel and mode
+        if args.mode == "connect":
+            session_id = args.session
+            if not session_id:
+                logging.error("Missing --session for connect mode")
+                sys.exit(1)
+            
+            channel_topic = f"realtime:support:{session_id}"
+            
+            # Create Phoenix client first
+            phoenix_client = PhoenixClient(supabase_url, anon_key, access_token, channel_topic)
+            bridge = RemoteSerialBridge(args.port, phoenix_client, "connect", session_id)
         
-        logging.info(f"Looking up device: {device_identifier}")
-        device_uuid, user_uuid = await get_device_user_uuid(supabase_url, anon_key, device_identifier)
-        logging.info(f"Found device UUID: {device_uuid}, user UUID: {user_uuid}")
+        elif args.mode == "direct":
+            device_identifier = args.device
+            if not device_identifier:
+                logging.error("Missing --device for direct mode")
+                sys.exit(1)
+            
+            logging.info(f"Looking up device: {device_identifier}")
+            device_uuid, user_uuid = await get_device_user_uuid(http_session, supabase_url, anon_key, device_identifier)
+            logging.info(f"Found device UUID: {device_uuid}, user UUID: {user_uuid}")
+            
+            channel_topic = f"realtime:user:{user_uuid}"
+            
+            # Create Phoenix client first
+            phoenix_client = PhoenixClient(supabase_url, anon_key, access_token, channel_topic)
+            bridge = RemoteSerialBridge(args.port, phoenix_client, "direct")
+            bridge.device_uuid = device_uuid
+            bridge.user_uuid = user_uuid
         
-        channel_topic = f"realtime:user:{user_uuid}"
+        else:
+            logging.error(f"Unknown mode: {args.mode}")
+            sys.exit(1)
         
-        # Create Phoenix client first
-        phoenix_client = PhoenixClient(supabase_url, anon_key, access_token, channel_topic)
-        bridge = RemoteSerialBridge(args.port, phoenix_client, "direct")
-        bridge.device_uuid = device_uuid
-        bridge.user_uuid = user_uuid
-    
-    else:
-        logging.error(f"Unknown mode: {args.mode}")
-        sys.exit(1)
+    finally:
+        if http_session:
+            await http_session.close()
     
     # Setup signal handlers
     shutdown_event = asyncio.Event()
@@ -909,6 +1176,18 @@ def main():
         datefmt="%Y-%m-%d %H:%M:%S",
     )
     
+    # Parse .env now so get_env_var() inside the event loop is a cache hit
+    # rather than blocking file I/O
+    load_env_file(_ENV_PATH)
+    
+    # Prefer uvloop's event loop (faster socket I/O) when it is installed
+    try:
+        import uvloop
+    except ImportError:
+        pass
+    else:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    
     # Run async main
     try:
         asyncio.run(main_async(args))